@@ -1,12 +1,10 @@
 import os
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import IsolationForest
-import matplotlib.pyplot as plt
-
-# Create the anomalies folder if it doesn't exist
-os.makedirs("outputs/anomalies", exist_ok=True)
+from instrumentation import instrument, show
+from result_cache import memoize
 
+@instrument
 def threshold_based_detection(data, column, threshold, output_file="outputs/anomalies/threshold_anomalies.csv"):
     """
     Detects anomalies based on a predefined threshold.
@@ -21,13 +19,15 @@ def threshold_based_detection(data, column, threshold, output_file="outputs/anom
     pd.DataFrame: DataFrame with anomalies.
     """
     anomalies = data[data[column] > threshold]
-    print(f"\nThreshold-Based Anomalies (>{threshold}) in {column}:")
-    print(anomalies)
+    show(f"\nThreshold-Based Anomalies (>{threshold}) in {column}:")
+    show(anomalies)
 
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
     anomalies.to_csv(output_file, index=False)
     print(f"Threshold-based anomalies saved to {output_file}")
     return anomalies
 
+@instrument
 def z_score_detection(data, column, threshold=3.0, output_file="outputs/anomalies/z_score_anomalies.csv"):
     """
     Detects anomalies using Z-scores.
@@ -47,13 +47,32 @@ def z_score_detection(data, column, threshold=3.0, output_file="outputs/anomalie
     data["z_anomaly"] = (data["z_score"].abs() > threshold).astype(int)
 
     anomalies = data[data["z_anomaly"] == 1]
-    print(f"\nZ-Score-Based Anomalies in {column}:")
-    print(anomalies)
+    show(f"\nZ-Score-Based Anomalies in {column}:")
+    show(anomalies)
 
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
     anomalies.to_csv(output_file, index=False)
     print(f"Z-Score anomalies saved to {output_file}")
     return data
 
+@memoize
+def isolation_forest_labels(values, contamination):
+    """
+    Fits an Isolation Forest and labels each sample (cached on disk).
+
+    Parameters:
+    values (np.array): Samples, shaped (samples, features).
+    contamination (float): The proportion of anomalies in the dataset.
+
+    Returns:
+    np.array: 1 for anomalous samples, 0 otherwise.
+    """
+    from sklearn.ensemble import IsolationForest
+
+    isolation_forest = IsolationForest(contamination=contamination, random_state=42)
+    return (isolation_forest.fit_predict(values) == -1).astype(int)
+
+@instrument
 def isolation_forest_detection(data, column, contamination=0.05, output_file="outputs/anomalies/isolation_forest_anomalies.csv"):
     """
     Detects anomalies using Isolation Forest.
@@ -67,18 +86,294 @@ def isolation_forest_detection(data, column, contamination=0.05, output_file="ou
     Returns:
     pd.DataFrame: Dataset with anomaly flags.
     """
-    isolation_forest = IsolationForest(contamination=contamination, random_state=42)
-    data["if_anomaly"] = isolation_forest.fit_predict(data[[column]])
-    data["if_anomaly"] = (data["if_anomaly"] == -1).astype(int)
+    data["if_anomaly"] = isolation_forest_labels(data[[column]].to_numpy(), contamination)
 
     anomalies = data[data["if_anomaly"] == 1]
-    print(f"\nIsolation Forest Anomalies in {column}:")
-    print(anomalies)
+    show(f"\nIsolation Forest Anomalies in {column}:")
+    show(anomalies)
 
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
     anomalies.to_csv(output_file, index=False)
     print(f"Isolation Forest anomalies saved to {output_file}")
     return data
 
+@instrument
+def incremental_z_score_detection(data, column, threshold=3.0, state=None):
+    """
+    Z-score detection over a stream of chunks, using running statistics.
+
+    Each chunk is scored against the mean and standard deviation of every sample seen so
+    far including the chunk, so a single chunk gives the same result as z_score_detection.
+    The running count, mean and sum of squared deviations are merged chunk by chunk, so
+    earlier samples never need to be kept.
+
+    Parameters:
+    data (pd.DataFrame): The chunk.
+    column (str): The column to check for anomalies.
+    threshold (float): Z-score threshold for anomalies.
+    state (dict): State returned by the previous chunk, or None for the first chunk.
+
+    Returns:
+    tuple: (pd.DataFrame, dict) with the chunk's z_score and z_anomaly columns added, and the state for the next chunk.
+    """
+    state = dict(state or {"count": 0, "mean": 0.0, "m2": 0.0})
+    values = data[column].to_numpy(dtype=float)
+    values = values[~np.isnan(values)]
+    if values.size:
+        # Combine the chunk's statistics with the running ones (Chan et al.)
+        count = state["count"] + values.size
+        chunk_mean = values.mean()
+        delta = chunk_mean - state["mean"]
+        state["m2"] += ((values - chunk_mean) ** 2).sum() + delta ** 2 * state["count"] * values.size / count
+        state["mean"] += delta * values.size / count
+        state["count"] = count
+
+    std = np.sqrt(state["m2"] / (state["count"] - 1)) if state["count"] > 1 else np.nan
+    data["z_score"] = (data[column] - state["mean"]) / std
+    data["z_anomaly"] = (data["z_score"].abs() > threshold).astype(int)
+    return data, state
+
+def _sliding_dot_product(query, series):
+    """
+    Dot products of query with every subsequence of series of the same length, via FFT.
+    """
+    from scipy import fft
+
+    m, n = query.size, series.size
+    size = fft.next_fast_len(n + m - 1, real=True)
+    product = fft.irfft(fft.rfft(series, size) * fft.rfft(query[::-1], size), size)
+    return product[m - 1:n]
+
+def _moving_mean_std(series, m, block_cells=4000000):
+    """
+    Mean and standard deviation of every length-m subsequence.
+
+    Each window is centred on its own mean before squaring (computed in blocks of windows
+    to bound memory), so flat windows get a standard deviation of zero at any level
+    instead of the rounding noise left by the cumulative-sum formula.
+    """
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    windows = sliding_window_view(series, m)
+    mean, std = np.empty(len(windows)), np.empty(len(windows))
+    step = max(1, block_cells // m)
+    for start in range(0, len(windows), step):
+        block = windows[start:start + step]
+        mean[start:start + step] = block.mean(axis=1)
+        std[start:start + step] = np.sqrt(((block - mean[start:start + step, None]) ** 2).mean(axis=1))
+    return mean, std
+
+def _profile_rows(series, m, row_start, row_stop, upper):
+    """
+    Scans rows [row_start, row_stop) of the distance matrix of the length-m subsequences (STOMP).
+
+    The first row's dot products come from an FFT; every following row is updated from
+    the previous one in O(n). The scan tracks Pearson correlations, which order pairs the
+    same way as z-normalised distances, and trivial matches within m // 4 of the diagonal
+    are excluded. With upper=True only columns to the right of the diagonal are visited,
+    which covers every pair once when all rows are processed.
+
+    Returns:
+    tuple: (row maxima, their column indices, column maxima, their row indices) of the correlation.
+    """
+    # Distances do not depend on the series' offset; removing it keeps the dot products accurate
+    series = series - series.mean()
+    n_sub = series.size - m + 1
+    exclusion = max(1, m // 4)
+    mean, std = _moving_mean_std(series, m)
+    # Flat relative to the window's level, so rounding noise at large values still counts as flat
+    constant = std <= 1e-8 * np.maximum(1.0, np.abs(mean))
+    has_constant = constant.any()
+    scale = 1.0 / (m * np.where(constant, 1.0, std))
+
+    row_max = np.full(row_stop - row_start, -np.inf)
+    row_index = np.full(row_stop - row_start, -1, dtype=np.int64)
+    col_max = np.full(n_sub, -np.inf)
+    col_index = np.full(n_sub, -1, dtype=np.int64)
+    correlation_buffer = np.empty(n_sub)
+    better_buffer = np.empty(n_sub, dtype=bool)
+
+    first_column = _sliding_dot_product(series[:m], series)
+    qt = _sliding_dot_product(series[row_start:row_start + m], series)
+    for i in range(row_start, row_stop):
+        if i > row_start:
+            # Only the columns still to be visited need updating
+            j0 = max(i if upper else 0, 1)
+            qt[j0:] = (qt[j0 - 1:-1] - series[i - 1] * series[j0 - 1:n_sub - 1]
+                       + series[i + m - 1] * series[j0 + m - 1:m + n_sub - 1])
+            qt[0] = first_column[i]
+        start = i + exclusion + 1 if upper else 0
+        if start >= n_sub:
+            continue
+
+        correlation = correlation_buffer[:n_sub - start]
+        np.multiply(mean[start:], m * mean[i], out=correlation)
+        np.subtract(qt[start:], correlation, out=correlation)
+        np.multiply(correlation, scale[start:], out=correlation)
+        correlation *= m * scale[i]
+        # Two flat subsequences are identical; a flat and a varying one are at distance sqrt(m)
+        if constant[i]:
+            correlation[:] = np.where(constant[start:], 1.0, 0.5)
+        elif has_constant:
+            np.copyto(correlation, 0.5, where=constant[start:])
+        if not upper:
+            correlation[max(0, i - exclusion):i + exclusion + 1] = -np.inf
+
+        best = np.argmax(correlation)
+        row_max[i - row_start], row_index[i - row_start] = correlation[best], start + best
+        better = better_buffer[:n_sub - start]
+        np.greater(correlation, col_max[start:], out=better)
+        np.maximum(correlation, col_max[start:], out=col_max[start:])
+        np.copyto(col_index[start:], i, where=better)
+    return row_max, row_index, col_max, col_index
+
+def _run_profile_rows(series, m, row_ranges, upper, max_workers):
+    """
+    Runs _profile_rows over row ranges, in a process pool when there is more than one range and worker.
+    """
+    args = ([series] * len(row_ranges), [m] * len(row_ranges), [start for start, _ in row_ranges],
+            [stop for _, stop in row_ranges], [upper] * len(row_ranges))
+    if max_workers > 1 and len(row_ranges) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_profile_rows, *args))
+    return list(map(_profile_rows, *args))
+
+def _row_ranges(row_start, row_stop, max_workers, block_rows):
+    """
+    Splits rows into ranges: several per worker for load balancing, and at most block_rows
+    each so the rolling dot-product update is restarted from an FFT regularly.
+    """
+    rows = row_stop - row_start
+    size = max(1, min(block_rows, -(-rows // (4 * max_workers))))
+    return [(start, min(start + size, row_stop)) for start in range(row_start, row_stop, size)]
+
+def _merge_profile(correlation, index, maxima, maxima_index, offset=0):
+    """
+    Keeps the higher correlation (nearer neighbour) of the current and newly scanned values.
+    """
+    better = maxima > correlation[offset:offset + maxima.size]
+    correlation[offset:offset + maxima.size][better] = maxima[better]
+    index[offset:offset + maxima.size][better] = maxima_index[better]
+
+def matrix_profile(values, window, max_workers=None, block_rows=8192, state=None):
+    """
+    Computes (or extends) the matrix profile of a series.
+
+    The matrix profile holds, for every subsequence of length window, the z-normalised
+    Euclidean distance to its nearest non-trivial match. Exact computation is O(n^2): rows
+    of the distance matrix are split across a process pool, and each range starts from an
+    FFT sliding dot product and updates it row by row. With state from a previous call,
+    values are the appended samples and only the distances involving new subsequences
+    are computed, O(n * appended).
+
+    Parameters:
+    values (array-like): The series (or the appended samples when state is given); NaNs are interpolated.
+    window (int): Subsequence length in samples.
+    max_workers (int): Worker processes (defaults to the number of CPUs).
+    block_rows (int): Maximum rows per task.
+    state (dict): State returned by the previous call, or None.
+
+    Returns:
+    dict: State with "values", "window", "profile" (distances), "index" (nearest neighbour of
+    each subsequence) and "correlation" (the profile as correlations, used for updates).
+    """
+    values = pd.Series(np.asarray(values, dtype=float)).interpolate(limit_direction="both").to_numpy()
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if state is None:
+        series = values
+        old_rows = 0
+    else:
+        if state["window"] != window:
+            raise ValueError("The window must not change between incremental updates.")
+        series = np.concatenate([state["values"], values])
+        old_rows = max(0, state["values"].size - window + 1)
+
+    n_sub = series.size - window + 1
+    if n_sub < 2:
+        raise ValueError(f"The series needs more than {window} samples.")
+    correlation = np.full(n_sub, -np.inf)
+    index = np.full(n_sub, -1, dtype=np.int64)
+    if old_rows:
+        correlation[:old_rows], index[:old_rows] = state["correlation"], state["index"]
+
+    ranges = _row_ranges(old_rows, n_sub, max_workers, block_rows)
+    results = _run_profile_rows(series, window, ranges, old_rows == 0, max_workers)
+    for (start, _), (row_max, row_index, col_max, col_index) in zip(ranges, results):
+        _merge_profile(correlation, index, row_max, row_index, offset=start)
+        _merge_profile(correlation, index, col_max, col_index)
+
+    profile = np.sqrt(np.maximum(2 * window * (1 - correlation), 0.0))
+    return {"values": series, "window": window, "profile": profile, "index": index, "correlation": correlation}
+
+def find_discords(profile, window, top_k=3):
+    """
+    Picks the top-k discords (subsequences farthest from their nearest match) from a matrix profile.
+
+    Parameters:
+    profile (np.array): Matrix profile distances.
+    window (int): Subsequence length; discords are at least this far apart.
+    top_k (int): Number of discords.
+
+    Returns:
+    list: (start index, distance) pairs, most anomalous first.
+    """
+    profile = np.where(np.isfinite(profile), profile, -np.inf)
+    discords = []
+    for _ in range(top_k):
+        start = int(np.argmax(profile))
+        if profile[start] == -np.inf:
+            break
+        discords.append((start, float(profile[start])))
+        profile[max(0, start - window + 1):start + window] = -np.inf
+    return discords
+
+@instrument
+def matrix_profile_discord_detection(data, columns, window, top_k=3, time_column="timestamp", max_workers=None,
+                                     state=None, output_file="outputs/anomalies/matrix_profile_discords.csv"):
+    """
+    Detects anomalous shapes (discords) per channel with the matrix profile.
+
+    A discord is the subsequence whose nearest match elsewhere in the series is farthest
+    away, e.g. one thermal cycle that differs from all the others. Pass the returned state
+    back with the next chunk of data to update the profiles incrementally. The cost grows
+    with the square of the series length: for a year of 1 Hz data, run it on per-minute
+    means (telemetry_rollups) with a window of a few orbits.
+
+    Parameters:
+    data (pd.DataFrame): The dataset (or the appended rows when state is given).
+    columns (list): Channels to search.
+    window (int): Subsequence length in samples.
+    top_k (int): Number of discords per channel.
+    time_column (str): Column name for the timestamps.
+    max_workers (int): Worker processes (defaults to the number of CPUs).
+    state (dict): State returned by the previous call, or None.
+    output_file (str): Path to save the discords.
+
+    Returns:
+    tuple: (pd.DataFrame, dict) with channel, rank, start, end, start_index and distance per
+    discord, and the state for the next call.
+    """
+    state = dict(state or {})
+    times = np.concatenate([state["times"], data[time_column].values]) if "times" in state else data[time_column].values
+    state["times"] = times
+
+    records = []
+    for column in columns:
+        state[column] = matrix_profile(data[column].values, window, max_workers=max_workers, state=state.get(column))
+        for rank, (start, distance) in enumerate(find_discords(state[column]["profile"], window, top_k), start=1):
+            records.append({"channel": column, "rank": rank, "start": times[start], "end": times[start + window - 1],
+                            "start_index": start, "distance": distance})
+    discords = pd.DataFrame(records, columns=["channel", "rank", "start", "end", "start_index", "distance"])
+    show(f"\nMatrix Profile Discords (window {window}):")
+    show(discords)
+
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    discords.to_csv(output_file, index=False)
+    print(f"Matrix profile discords saved to {output_file}")
+    return discords, state
+
 if __name__ == "__main__":
     # Load the dataset
     file_path = "outputs/interpolated_data.csv"
@@ -96,4 +391,12 @@ if __name__ == "__main__":
     # Save updated datasets
     z_score_data.to_csv("outputs/anomalies/z_score_data.csv", index=False)
     isolation_forest_data.to_csv("outputs/anomalies/isolation_forest_data.csv", index=False)
+
+    # Matrix profile discords: two days of 1-minute thermal data with one distorted orbit
+    from synthetic_telemetry import generate_telemetry
+    thermal = generate_telemetry("temperature", 2880, cadence_s=60.0)
+    thermal.loc[1500:1590, "temperature_c"] = 35.0 + 15.0 * np.sin(np.linspace(0, np.pi, 91))
+    discords, state = matrix_profile_discord_detection(thermal.iloc[:2000], ["temperature_c"], window=90)
+    # The rest of the data arrives later; only the new subsequences are computed
+    discords, state = matrix_profile_discord_detection(thermal.iloc[2000:], ["temperature_c"], window=90, state=state)
     print("\nAnomaly detection completed. Results saved to outputs/anomalies/")
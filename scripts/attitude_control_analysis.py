@@ -1,6 +1,6 @@
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+from instrumentation import instrument, show
 
 def quaternion_to_rotation_matrix(q):
     """
@@ -42,6 +42,30 @@ def quaternion_to_euler_angles(q):
 
     return roll, pitch, yaw
 
+def euler_angles_to_quaternion(roll, pitch, yaw):
+    """
+    Converts Euler angles (roll, pitch, yaw) to a quaternion; the inverse of quaternion_to_euler_angles.
+
+    Accepts scalars or arrays of angles.
+
+    Parameters:
+    roll (float or array): Roll (x-axis rotation) in degrees.
+    pitch (float or array): Pitch (y-axis rotation) in degrees.
+    yaw (float or array): Yaw (z-axis rotation) in degrees.
+
+    Returns:
+    np.array: Quaternion [q0, q1, q2, q3] (one row per component for arrays).
+    """
+    cr, sr = np.cos(np.radians(roll) / 2), np.sin(np.radians(roll) / 2)
+    cp, sp = np.cos(np.radians(pitch) / 2), np.sin(np.radians(pitch) / 2)
+    cy, sy = np.cos(np.radians(yaw) / 2), np.sin(np.radians(yaw) / 2)
+    return np.array([
+        cr * cp * cy + sr * sp * sy,
+        sr * cp * cy - cr * sp * sy,
+        cr * sp * cy + sr * cp * sy,
+        cr * cp * sy - sr * sp * cy,
+    ])
+
 def validate_quaternion(q):
     """
     Validates a quaternion by checking its normalization.
@@ -55,6 +79,80 @@ def validate_quaternion(q):
     norm = np.linalg.norm(q)
     return np.isclose(norm, 1.0)
 
+@instrument
+def slerp_resample(data, target_times, quaternion_columns=("q0", "q1", "q2", "q3"), time_column="timestamp",
+                   max_gap=None, block_size=1000000):
+    """
+    Resamples a quaternion time series onto new timestamps with spherical linear interpolation (SLERP).
+
+    Quaternions are normalised and their signs made continuous first (q and -q are the same
+    attitude, and interpolating between opposite hemispheres would take the long way round).
+    Targets outside the series, or between two samples further apart than max_gap, are NaN.
+    Samples with duplicate timestamps are allowed.
+
+    Parameters:
+    data (pd.DataFrame): Attitude data with a time column and quaternion columns, sorted by time.
+    target_times (array-like): Timestamps to interpolate at (same type as the time column).
+    quaternion_columns (tuple): Names of the q0 (scalar), q1, q2, q3 columns.
+    time_column (str): Column name for time (datetimes or seconds).
+    max_gap (float or str): Largest sample spacing to interpolate across, in seconds or as a
+    pd.Timedelta string such as "5min" (None interpolates across any gap).
+    block_size (int): Targets interpolated per block, bounding temporary memory.
+
+    Returns:
+    pd.DataFrame: The target timestamps and the interpolated quaternion columns.
+    """
+    from data_transformation import to_seconds
+
+    t = to_seconds(data[time_column].values)
+    q = data[list(quaternion_columns)].to_numpy(dtype=float)
+    q = q / np.linalg.norm(q, axis=1, keepdims=True)
+    # Flip each sample into the hemisphere of its predecessor
+    signs = np.cumprod(np.concatenate([[1.0], np.where(np.einsum("ij,ij->i", q[:-1], q[1:]) < 0, -1.0, 1.0)]))
+    q *= signs[:, None]
+
+    target_values = np.asarray(target_times)
+    target = to_seconds(target_values)
+    if isinstance(max_gap, str):
+        max_gap = pd.Timedelta(max_gap).total_seconds()
+
+    result = np.full((target.size, 4), np.nan)
+    if t.size >= 2:
+        for start in range(0, target.size, block_size):
+            tt = target[start:start + block_size]
+            index = np.clip(np.searchsorted(t, tt, side="right") - 1, 0, t.size - 2)
+            t0, t1 = t[index], t[index + 1]
+            span = t1 - t0
+            # Duplicate timestamps give zero spans; take the earlier sample there
+            fraction = np.where(span > 0, (tt - t0) / np.where(span > 0, span, 1.0), 0.0)
+            q0, q1 = q[index], q[index + 1]
+
+            # Standard SLERP weights; fall back to normalised linear interpolation for tiny angles
+            dot = np.clip(np.einsum("ij,ij->i", q0, q1), -1.0, 1.0)
+            theta = np.arccos(dot)
+            sin_theta = np.sin(theta)
+            small = sin_theta < 1e-6
+            safe_sin = np.where(small, 1.0, sin_theta)
+            w0 = np.where(small, 1.0 - fraction, np.sin((1.0 - fraction) * theta) / safe_sin)
+            w1 = np.where(small, fraction, np.sin(fraction * theta) / safe_sin)
+            block = w0[:, None] * q0 + w1[:, None] * q1
+            block /= np.linalg.norm(block, axis=1, keepdims=True)
+
+            invalid = (tt < t[0]) | (tt > t[-1])
+            if max_gap is not None:
+                # Targets landing exactly on a sample keep it even next to a gap
+                on_sample = (fraction == 0) | (fraction == 1)
+                invalid |= (span > max_gap) & ~on_sample
+            block[invalid] = np.nan
+            result[start:start + block_size] = block
+    elif t.size == 1:
+        result[target == t[0]] = q[0]
+
+    resampled = pd.DataFrame(result, columns=list(quaternion_columns))
+    resampled.insert(0, time_column, target_values)
+    return resampled
+
+@instrument
 def compare_sensor_data(gyro_data, star_tracker_data):
     """
     Compares gyroscope data with star tracker data to identify discrepancies.
@@ -69,6 +167,7 @@ def compare_sensor_data(gyro_data, star_tracker_data):
     differences = star_tracker_data - gyro_data
     return differences
 
+@instrument
 def plot_orientation(data, title, output_file):
     """
     Plots orientation data (roll, pitch, yaw) over time.
@@ -78,6 +177,8 @@ def plot_orientation(data, title, output_file):
     title (str): Title of the plot.
     output_file (str): Path to save the plot.
     """
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(10, 6))
     plt.plot(data["timestamp"], data["roll"], label="Roll")
     plt.plot(data["timestamp"], data["pitch"], label="Pitch")
@@ -98,7 +199,7 @@ if __name__ == "__main__":
 
     # Quaternion validation
     data["quaternion_valid"] = data[["q0", "q1", "q2", "q3"]].apply(lambda q: validate_quaternion(q.values), axis=1)
-    print(f"Quaternion Validation Results:\n{data[['timestamp', 'quaternion_valid']]}")
+    show("Quaternion Validation Results:", data[["timestamp", "quaternion_valid"]], sep="\n")
 
     # Convert quaternion to Euler angles
     data[["roll", "pitch", "yaw"]] = data[["q0", "q1", "q2", "q3"]].apply(lambda q: pd.Series(quaternion_to_euler_angles(q.values)), axis=1)
@@ -110,4 +211,14 @@ if __name__ == "__main__":
     gyro_data = pd.read_csv("data/sample_gyro_data.csv", parse_dates=["timestamp"])
     star_tracker_data = data[["timestamp", "roll", "pitch", "yaw"]]
     differences = compare_sensor_data(gyro_data[["roll", "pitch", "yaw"]], star_tracker_data[["roll", "pitch", "yaw"]])
-    print(f"\nDifferences between Gyroscope and Star Tracker Data:\n{differences}")
+    show("\nDifferences between Gyroscope and Star Tracker Data:", differences, sep="\n")
+
+    # Put the Euler-angle orientation series on a 20-minute time base with SLERP
+    orientation = pd.read_csv("data/orientation_sample.csv", parse_dates=["timestamp"])
+    orientation[["q0", "q1", "q2", "q3"]] = euler_angles_to_quaternion(
+        orientation["roll_deg"], orientation["pitch_deg"], orientation["yaw_deg"]).T
+    target_times = pd.date_range(data["timestamp"].min(), data["timestamp"].max(), freq="20min").values
+    aligned = slerp_resample(orientation, target_times, max_gap="2h")
+    aligned["roll"], aligned["pitch"], aligned["yaw"] = quaternion_to_euler_angles(
+        aligned[["q0", "q1", "q2", "q3"]].to_numpy().T)
+    show("\nOrientation resampled onto the attitude timestamps:", aligned, sep="\n")
@@ -0,0 +1,249 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+from synthetic_telemetry import generate_telemetry
+from result_cache import configure as configure_cache
+
+# Benchmarks are run with a non-interactive plotting backend so plt.show() does not block
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+DEFAULT_SIZES = [10**3, 10**4, 10**5, 10**6]
+
+def _close_figures():
+    if "matplotlib.pyplot" in sys.modules:
+        sys.modules["matplotlib.pyplot"].close("all")
+
+def _bench_clean_data(data, out):
+    from data_ingestion import clean_data
+    clean_data(data)
+
+def _bench_quaternion_apply(data, out):
+    from attitude_control_analysis import quaternion_to_euler_angles
+    data[["q0", "q1", "q2", "q3"]].apply(lambda q: pd.Series(quaternion_to_euler_angles(q.values)), axis=1)
+
+def _bench_lowpass(data, out):
+    from data_filtering import butter_lowpass_filter
+    butter_lowpass_filter(data["temperature_c"].values, 0.1, 1)
+
+def _bench_highpass(data, out):
+    from data_filtering import butter_highpass_filter
+    butter_highpass_filter(data["temperature_c"].values, 0.01, 1)
+
+def _bench_bandpass(data, out):
+    from data_filtering import butter_bandpass_filter
+    butter_bandpass_filter(data["temperature_c"].values, 0.01, 0.1, 1)
+
+def _bench_fft(data, out):
+    from data_transformation import perform_fft
+    perform_fft(data["temperature_c"].values, 1, output_file=os.path.join(out, "fft.png"))
+    _close_figures()
+
+def _bench_z_score(data, out):
+    from anomaly_detection import z_score_detection
+    z_score_detection(data, "temperature_c", 3.0, output_file=os.path.join(out, "z.csv"))
+
+def _bench_isolation_forest(data, out):
+    from anomaly_detection import isolation_forest_detection
+    isolation_forest_detection(data, "temperature_c", 0.01, output_file=os.path.join(out, "if.csv"))
+
+def _bench_heat_fit(data, out):
+    from thermal_analysis import fit_heat_dissipation
+    decay = data[["time_s"]].copy()
+    decay["temperature_c"] = 40.0 * np.exp(-decay["time_s"] / (decay["time_s"].iloc[-1] / 3 + 1)) + 20.0
+    fit_heat_dissipation(decay, "time_s", "temperature_c", output_file=os.path.join(out, "fit.png"))
+    _close_figures()
+
+def _bench_exceedance_events(data, out):
+    from thermal_analysis import detect_exceedance_events
+    detect_exceedance_events(data, {"temperature_c": 45.0}, hysteresis=2.0, min_duration=10,
+                             output_file=os.path.join(out, "events.csv"))
+
+def _bench_battery(data, out):
+    from power_system_monitoring import simulate_battery_soc
+    simulate_battery_soc(data, "power_generation_w", "power_consumption_w", capacity_wh=500.0)
+
+def _bench_limits(data, out):
+    from limit_checking import check_limits
+    limits = pd.DataFrame({
+        "channel": ["temperature_c", "power_consumption_w", "voltage_v"], "mode": "",
+        "red_low": [-20, 80, 3.0], "yellow_low": [0, 90, 3.1], "yellow_high": [24, 125, 3.45], "red_high": [26, 130, 3.6],
+    })
+    check_limits(data, limits, output_file=os.path.join(out, "limits.csv"))
+
+def _bench_rollups(data, out):
+    from telemetry_rollups import build_rollups
+    build_rollups(data, ["power_generation_w", "power_consumption_w"])
+
+def _bench_orbital_elements(data, out):
+    from orbital_analysis import calculate_orbital_elements
+    positions = data[["x_km", "y_km", "z_km"]].to_numpy()
+    velocities = data[["vx_km_s", "vy_km_s", "vz_km_s"]].to_numpy()
+    for position, velocity in zip(positions, velocities):
+        calculate_orbital_elements(position, velocity)
+
+# name -> (telemetry kind, benchmark function, largest size run by default)
+BENCHMARKS = {
+    "clean_data": ("housekeeping", _bench_clean_data, 10**8),
+    "quaternion_to_euler_angles_apply": ("attitude", _bench_quaternion_apply, 10**4),
+    "butter_lowpass_filter": ("housekeeping", _bench_lowpass, 10**8),
+    "butter_highpass_filter": ("housekeeping", _bench_highpass, 10**8),
+    "butter_bandpass_filter": ("housekeeping", _bench_bandpass, 10**8),
+    "perform_fft": ("housekeeping", _bench_fft, 10**7),
+    "z_score_detection": ("housekeeping", _bench_z_score, 10**8),
+    "isolation_forest_detection": ("housekeeping", _bench_isolation_forest, 10**6),
+    "fit_heat_dissipation": ("temperature", _bench_heat_fit, 10**6),
+    "detect_exceedance_events": ("temperature", _bench_exceedance_events, 10**8),
+    "simulate_battery_soc": ("power", _bench_battery, 10**8),
+    "check_limits": ("housekeeping", _bench_limits, 10**8),
+    "build_rollups": ("power", _bench_rollups, 10**8),
+    "calculate_orbital_elements_loop": ("orbit", _bench_orbital_elements, 10**4),
+}
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def _measure(func, data, out, repeat, measure_memory):
+    """
+    Runs one benchmark: best wall time over repeat runs, then one traced run for peak allocations.
+    """
+    times = []
+    for _ in range(repeat):
+        sample = data.copy()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func(sample, out)
+            times.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if measure_memory:
+        sample = data.copy()
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func(sample, out)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return min(times), peak_mb
+
+def run_benchmarks(names=None, sizes=DEFAULT_SIZES, repeat=3, seed=0, measure_memory=True, ignore_caps=False,
+                   output_file=None):
+    """
+    Benchmarks the hot functions on synthetic telemetry of increasing size.
+
+    Parameters:
+    names (list): Benchmarks to run (defaults to all of BENCHMARKS).
+    sizes (list): Row counts to run each benchmark at.
+    repeat (int): Timed repetitions per case; the best time is recorded.
+    seed (int): Seed for the synthetic telemetry.
+    measure_memory (bool): Record peak traced allocations with an extra run.
+    ignore_caps (bool): Also run sizes above a benchmark's default largest size.
+    output_file (str): Path of the JSON results file (defaults to outputs/benchmarks/<commit>.json).
+
+    Returns:
+    dict: Results with run metadata and one record per (benchmark, rows).
+    """
+    names = names or list(BENCHMARKS)
+    # Repeated runs on the same data would otherwise time cache hits
+    configure_cache(enabled=False)
+    commit = _git_commit()
+    results = {
+        "commit": commit,
+        "created": pd.Timestamp.now(tz="UTC").isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "records": [],
+    }
+
+    with tempfile.TemporaryDirectory() as out:
+        for name in names:
+            kind, func, max_rows = BENCHMARKS[name]
+            # Warm-up run so lazy imports are not charged to the first size
+            with contextlib.redirect_stdout(io.StringIO()):
+                func(generate_telemetry(kind, 100, seed=seed), out)
+            for rows in sizes:
+                if rows > max_rows and not ignore_caps:
+                    print(f"{name:<34} {rows:>11,} rows  skipped (above {max_rows:,})")
+                    continue
+                data = generate_telemetry(kind, rows, seed=seed)
+                seconds, peak_mb = _measure(func, data, out, repeat, measure_memory)
+                record = {
+                    "benchmark": name,
+                    "rows": rows,
+                    "seconds": seconds,
+                    "rows_per_second": rows / seconds if seconds > 0 else None,
+                    "peak_mb": peak_mb,
+                }
+                results["records"].append(record)
+                memory = f"{peak_mb:10.1f} MB" if peak_mb is not None else ""
+                throughput = f"{record['rows_per_second']:14,.0f}" if record["rows_per_second"] is not None else f"{'-':>14}"
+                print(f"{name:<34} {rows:>11,} rows {seconds:10.4f} s {throughput} rows/s {memory}")
+
+    output_file = output_file or f"outputs/benchmarks/{commit}.json"
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    with open(output_file, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results saved to {output_file}")
+    return results
+
+def compare_results(baseline_file, current_file):
+    """
+    Compares two benchmark result files.
+
+    Parameters:
+    baseline_file (str): JSON results of the reference commit.
+    current_file (str): JSON results of the commit under test.
+
+    Returns:
+    pd.DataFrame: Per (benchmark, rows) times, speedup (baseline / current) and memory change.
+    """
+    frames = []
+    for label, file_path in (("baseline", baseline_file), ("current", current_file)):
+        with open(file_path) as f:
+            records = pd.DataFrame(json.load(f)["records"])
+        frames.append(records.set_index(["benchmark", "rows"])[["seconds", "peak_mb"]].add_prefix(f"{label}_"))
+    comparison = frames[0].join(frames[1], how="inner")
+    comparison["speedup"] = comparison["baseline_seconds"] / comparison["current_seconds"]
+    comparison["peak_mb_change"] = comparison["current_peak_mb"] - comparison["baseline_peak_mb"]
+    print(comparison.to_string(float_format=lambda value: f"{value:.4g}"))
+    return comparison.reset_index()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the analysis functions on synthetic telemetry.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run benchmarks and save JSON results.")
+    run.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), default=None)
+    run.add_argument("--sizes", nargs="+", type=lambda value: int(float(value)), default=DEFAULT_SIZES)
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--no-memory", action="store_true", help="Skip the traced run for peak memory.")
+    run.add_argument("--ignore-caps", action="store_true", help="Run slow benchmarks at every size.")
+    run.add_argument("--output", default=None)
+
+    compare = commands.add_parser("compare", help="Compare two result files.")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run_benchmarks(args.benchmarks, args.sizes, args.repeat, args.seed, not args.no_memory, args.ignore_caps,
+                       args.output)
+    else:
+        compare_results(args.baseline, args.current)
@@ -0,0 +1,123 @@
+import hashlib
+import inspect
+import pandas as pd
+import numpy as np
+
+try:
+    import xxhash  # Several times faster than blake2b on large arrays
+except ImportError:
+    xxhash = None
+
+def new_digest():
+    """
+    Returns an empty 128-bit digest (xxh3 when xxhash is installed, blake2b otherwise).
+    """
+    return xxhash.xxh3_128() if xxhash is not None else hashlib.blake2b(digest_size=16)
+
+def update_digest(digest, value):
+    """
+    Feeds a value into a digest by content, so equal values give equal hashes in every process.
+
+    Numeric arrays and columns are hashed from their raw memory, which is much faster
+    than pd.util.hash_pandas_object. Object arrays are hashed by their elements' values,
+    never by the pointers they hold.
+
+    Parameters:
+    digest: Digest from new_digest.
+    value: DataFrame, Series, Index, array, dict, list, tuple, function or any value with a stable repr.
+    """
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr([(str(name), str(dtype)) for name, dtype in value.dtypes.items()]).encode())
+        for name in value.columns:
+            update_digest(digest, value[name])
+        update_digest(digest, value.index)
+    elif isinstance(value, (pd.Series, pd.Index)):
+        if isinstance(value.dtype, np.dtype) and value.dtype.kind in "biufcmM":
+            update_digest(digest, value.to_numpy())
+        else:
+            digest.update(str(value.dtype).encode())
+            digest.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(str((value.dtype.str, value.shape)).encode())
+        if value.dtype.kind in "biufcmM":
+            digest.update(np.ascontiguousarray(value).data.cast("B"))
+        else:
+            try:
+                digest.update(pd.util.hash_array(value.ravel().astype(object)).tobytes())
+            except TypeError:  # Unhashable elements (lists, arrays): hash them one by one
+                for item in value.ravel():
+                    update_digest(digest, item)
+    elif isinstance(value, dict):
+        digest.update(f"dict{len(value)}".encode())
+        for key in sorted(value, key=str):
+            digest.update(str(key).encode())
+            update_digest(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            update_digest(digest, item)
+    elif callable(value):
+        digest.update(hash_function(value).encode())
+    else:
+        digest.update(repr(value).encode())
+
+def hash_value(*values):
+    """
+    Returns the content hash of one or more values (see update_digest).
+
+    Parameters:
+    values: The values.
+
+    Returns:
+    str: Hex digest.
+    """
+    digest = new_digest()
+    for value in values:
+        update_digest(digest, value)
+    return digest.hexdigest()
+
+def _update_code(digest, code):
+    """
+    Feeds a code object's bytecode and constants into a digest, recursing into nested
+    functions (whose code objects' reprs contain memory addresses).
+    """
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            _update_code(digest, const)
+        else:
+            digest.update(repr(const).encode())
+
+def hash_function(func):
+    """
+    Returns a hash identifying a function and its bytecode, so editing it changes the hash.
+
+    Parameters:
+    func (callable): The function (decorators are unwrapped).
+
+    Returns:
+    str: Hex digest.
+    """
+    func = inspect.unwrap(func)
+    digest = new_digest()
+    digest.update(f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}".encode())
+    code = getattr(func, "__code__", None)
+    if code is not None:
+        _update_code(digest, code)
+    return digest.hexdigest()
+
+def hash_file(file_path):
+    """
+    Returns the content hash of a file.
+
+    Parameters:
+    file_path (str): Path to the file.
+
+    Returns:
+    str: Hex digest.
+    """
+    digest = new_digest()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
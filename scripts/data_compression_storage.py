@@ -1,10 +1,12 @@
 import pandas as pd
 import os
 import zipfile
+from instrumentation import instrument
 
 # IMPORTANT:
 # In order to run this file, you may need to pip install: pyarrow, openpyxl
 
+@instrument
 def compress_to_csv_gzip(data, output_file):
     """
     Compresses the DataFrame to a GZIP-compressed CSV file.
@@ -16,6 +18,7 @@ def compress_to_csv_gzip(data, output_file):
     data.to_csv(output_file, index=False, compression="gzip")
     print(f"Data compressed and saved to {output_file}")
 
+@instrument
 def compress_to_parquet(data, output_file):
     """
     Compresses the DataFrame to a Parquet file with Snappy compression.
@@ -27,6 +30,7 @@ def compress_to_parquet(data, output_file):
     data.to_parquet(output_file, index=False, compression="snappy")
     print(f"Data compressed and saved to {output_file}")
 
+@instrument
 def compress_to_zip(file_paths, output_file):
     """
     Compresses multiple files into a ZIP archive.
@@ -40,6 +44,7 @@ def compress_to_zip(file_paths, output_file):
             zipf.write(file_path, os.path.basename(file_path))
     print(f"Files compressed into ZIP archive: {output_file}")
 
+@instrument
 def export_to_format(data, output_file, format="csv"):
     """
     Exports the DataFrame to the specified format.
@@ -1,8 +1,8 @@
 import pandas as pd
 import numpy as np
-from scipy.signal import butter, filtfilt
-import matplotlib.pyplot as plt
+from instrumentation import instrument
 
+@instrument
 def butter_lowpass_filter(data, cutoff, fs, order=4):
     """
     Applies a low-pass filter to the data.
@@ -16,30 +16,39 @@ def butter_lowpass_filter(data, cutoff, fs, order=4):
     Returns:
     array: The filtered data.
     """
+    from scipy.signal import butter, filtfilt
+
     nyquist = 0.5 * fs  # Nyquist frequency
     normal_cutoff = cutoff / nyquist
     b, a = butter(order, normal_cutoff, btype='low', analog=False)
     return filtfilt(b, a, data)
 
+@instrument
 def butter_highpass_filter(data, cutoff, fs, order=4):
     """
     Applies a high-pass filter to the data.
     """
+    from scipy.signal import butter, filtfilt
+
     nyquist = 0.5 * fs
     normal_cutoff = cutoff / nyquist
     b, a = butter(order, normal_cutoff, btype='high', analog=False)
     return filtfilt(b, a, data)
 
+@instrument
 def butter_bandpass_filter(data, lowcut, highcut, fs, order=4):
     """
     Applies a band-pass filter to the data.
     """
+    from scipy.signal import butter, filtfilt
+
     nyquist = 0.5 * fs
     low = lowcut / nyquist
     high = highcut / nyquist
     b, a = butter(order, [low, high], btype='band', analog=False)
     return filtfilt(b, a, data)
 
+@instrument
 def plot_filtered_data(original, filtered, title, output_file):
     """
     Plots the original and filtered data for comparison.
@@ -50,6 +59,8 @@ def plot_filtered_data(original, filtered, title, output_file):
     title (str): Plot title.
     output_file (str): Path to save the plot.
     """
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(10, 6))
     plt.plot(original, label="Original Signal", alpha=0.7)
     plt.plot(filtered, label="Filtered Signal", linewidth=2)
@@ -1,6 +1,41 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
+from instrumentation import instrument, show, is_quiet
 
+# Column dtypes per telemetry type. Channels are stored as float32 (about 7 significant
+# digits, ample for sensor readings), counters and flags as nullable Int16/Int32 (blank
+# cells become <NA>), and repeated labels such as operating modes as categoricals. Columns
+# of a file that are not listed get the schema's default dtype. Timestamps are parsed with
+# an explicit format and stored as datetime64[ns] whichever CSV engine is used.
+TELEMETRY_SCHEMAS = {
+    "housekeeping": {
+        "dtypes": {"temperature_c": "float32", "power_consumption_w": "float32", "voltage_v": "float32",
+                   "status_flags": "Int16", "mode": "category"},
+        "default_dtype": "float32",
+    },
+    "attitude": {
+        "dtypes": {"q0": "float32", "q1": "float32", "q2": "float32", "q3": "float32", "mode": "category"},
+        "default_dtype": "float32",
+    },
+    "gyro": {
+        "dtypes": {"roll": "float32", "pitch": "float32", "yaw": "float32", "status_flags": "Int16"},
+        "default_dtype": "float32",
+    },
+    "power": {
+        "dtypes": {"power_generation_w": "float32", "power_consumption_w": "float32", "mode": "category"},
+        "default_dtype": "float32",
+    },
+    "thermal": {
+        "dtypes": {"temperature_c": "float32", "time_s": "Int32", "sensor": "category"},
+        "default_dtype": "float32",
+    },
+}
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+@instrument
 def read_and_describe(file_path):
     """
     Reads a CSV file and displays basic information and statistics.
@@ -14,17 +49,19 @@ def read_and_describe(file_path):
     try:
         # Load the data
         data = pd.read_csv(file_path, parse_dates=["timestamp"])
-        print("\nData Overview:")
-        print(data.head())
-        print("\nData Info:")
-        print(data.info())
-        print("\nSummary Statistics:")
-        print(data.describe())
+        show("\nData Overview:")
+        show(data.head())
+        if not is_quiet():
+            print("\nData Info:")
+            data.info()
+            print("\nSummary Statistics:")
+            print(data.describe())
         return data
     except Exception as e:
         print(f"Error reading the file: {e}")
         return None
 
+@instrument
 def clean_data(data):
     """
     Cleans the dataset by handling missing values, outliers, and invalid entries.
@@ -38,7 +75,7 @@ def clean_data(data):
     # Handling missing values
     print("\nHandling Missing Values...")
     missing_summary = data.isnull().sum()
-    print(f"Missing Values:\n{missing_summary}")
+    show("Missing Values:", missing_summary, sep="\n")
 
     # Option 1: Fill missing numerical values with column mean
     num_cols = data.select_dtypes(include=[np.number]).columns
@@ -58,7 +95,7 @@ def clean_data(data):
         lower_bound = Q1 - 1.5 * IQR
         upper_bound = Q3 + 1.5 * IQR
         outliers = ((data[column] < lower_bound) | (data[column] > upper_bound)).sum()
-        print(f"{column}: {outliers} outliers detected.")
+        show(f"{column}: {outliers} outliers detected.")
         # Cap outliers
         data[column] = np.clip(data[column], lower_bound, upper_bound)
     print("Outliers capped to the IQR range.")
@@ -68,12 +105,116 @@ def clean_data(data):
     if "temperature_c" in data.columns:
         invalid_temps = data[data["temperature_c"] < -273.15]
         if not invalid_temps.empty:
-            print(f"Invalid temperatures detected:\n{invalid_temps}")
+            show("Invalid temperatures detected:", invalid_temps, sep="\n")
             data["temperature_c"] = data["temperature_c"].clip(lower=-273.15)
 
     print("\nData cleaning completed.")
     return data
 
+def csv_engine():
+    """
+    Returns the fastest available pd.read_csv engine.
+
+    Returns:
+    str: "pyarrow" when pyarrow is installed, "c" otherwise.
+    """
+    try:
+        import pyarrow  # noqa: F401
+        return "pyarrow"
+    except ImportError:
+        return "c"
+
+def _read_telemetry_file(file_path, kind, time_column, timestamp_format, engine):
+    """
+    Reads one telemetry file with the dtypes of its schema (runs in the worker processes).
+    """
+    schema = TELEMETRY_SCHEMAS[kind]
+    columns = pd.read_csv(file_path, nrows=0).columns
+    dtypes = {column: schema["dtypes"].get(column, schema["default_dtype"])
+              for column in columns if column != time_column}
+    data = pd.read_csv(file_path, engine=engine, dtype=dtypes, parse_dates=[time_column], date_format=timestamp_format)
+    # pyarrow parses to datetime64[s] and the c engine to datetime64[us]
+    data[time_column] = data[time_column].astype("datetime64[ns]")
+    return data
+
+def _concat_frames(frames):
+    """
+    Concatenates DataFrames into newly allocated columns, copying each value once.
+
+    The result has every column found in any frame, in order of first appearance; rows
+    from frames without a column get missing values there. Categorical columns are
+    combined with union_categoricals; pd.concat would turn categoricals with different
+    categories into object columns.
+    """
+    from pandas.api.types import union_categoricals
+
+    if len(frames) == 1:
+        return frames[0]
+    names = list(dict.fromkeys(column for frame in frames for column in frame.columns))
+    columns = {}
+    for column in names:
+        dtype = next(frame[column].dtype for frame in frames if column in frame.columns)
+        missing = not all(column in frame.columns for frame in frames)
+        if missing and isinstance(dtype, np.dtype) and dtype.kind in "biu":
+            dtype = np.dtype("float64")  # NumPy integers cannot hold the missing values
+        parts = [frame[column] if column in frame.columns else pd.Series(index=frame.index, dtype=dtype)
+                 for frame in frames]
+        if isinstance(dtype, pd.CategoricalDtype):
+            columns[column] = union_categoricals(parts, ignore_order=True)
+        elif isinstance(dtype, np.dtype):
+            columns[column] = np.concatenate([part.to_numpy() for part in parts])
+        else:  # Nullable extension arrays such as Int16 keep their mask
+            columns[column] = pd.concat(parts, ignore_index=True).array
+    return pd.DataFrame(columns, copy=False)
+
+@instrument
+def load_telemetry_files(files, kind="housekeeping", time_column="timestamp", timestamp_format=TIMESTAMP_FORMAT,
+                         max_workers=None, engine=None, source_column=None):
+    """
+    Loads many telemetry files of one type in parallel, with compact schema-driven dtypes.
+
+    Files are parsed in a process pool (pyarrow engine when available) and concatenated
+    in the given order, so daily archive files come out in time order.
+
+    Parameters:
+    files (str or list): Glob pattern (e.g. "archive/power_*.csv") or list of file paths.
+    kind (str): Telemetry type, one of TELEMETRY_SCHEMAS.
+    time_column (str): Column name for the timestamps.
+    timestamp_format (str): strftime format of the timestamps.
+    max_workers (int): Worker processes (defaults to the number of CPUs; 1 reads in this process).
+    engine (str): pd.read_csv engine (defaults to "pyarrow" if installed, else "c").
+    source_column (str): If given, adds a categorical column with the file each row came from.
+
+    Returns:
+    pd.DataFrame: The telemetry of all files.
+    """
+    if kind not in TELEMETRY_SCHEMAS:
+        raise ValueError(f"Unsupported telemetry type '{kind}'. Choose from {', '.join(TELEMETRY_SCHEMAS)}.")
+    files = sorted(glob.glob(files)) if isinstance(files, str) else list(files)
+    if not files:
+        raise FileNotFoundError("No telemetry files to load.")
+    engine = engine or csv_engine()
+    max_workers = min(max_workers or os.cpu_count() or 1, len(files))
+
+    args = ([kind] * len(files), [time_column] * len(files), [timestamp_format] * len(files), [engine] * len(files))
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            frames = list(executor.map(_read_telemetry_file, files, *args,
+                                       chunksize=max(1, len(files) // (4 * max_workers))))
+    else:
+        frames = list(map(_read_telemetry_file, files, *args))
+
+    if source_column is not None:
+        for file_path, frame in zip(files, frames):
+            frame[source_column] = pd.Categorical([os.path.basename(file_path)] * len(frame))
+    data = _concat_frames(frames)
+    del frames
+
+    memory_mb = data.memory_usage(deep=True).sum() / 2**20
+    print(f"Loaded {len(data)} rows of {kind} telemetry from {len(files)} file(s) "
+          f"({memory_mb:.1f} MB, {engine} engine, {max_workers} worker(s))")
+    return data
+
 if __name__ == "__main__":
     file_path = "data/sample_data.csv"  # Replace with your file path if needed
     data = read_and_describe(file_path)
@@ -82,3 +223,11 @@ if __name__ == "__main__":
         # Save cleaned data for further analysis
         cleaned_data.to_csv("outputs/cleaned_data.csv", index=False)
         print("Cleaned data saved to outputs/cleaned_data.csv")
+
+    # Load a week of daily power files at once
+    from synthetic_telemetry import write_synthetic_csv
+    for day in range(7):
+        write_synthetic_csv("power", 86400, f"outputs/archive/power_2024-11-{day + 1:02d}.csv", seed=day,
+                            start=f"2024-11-{day + 1:02d}")
+    archive = load_telemetry_files("outputs/archive/power_*.csv", kind="power", source_column="source_file")
+    show(archive.dtypes)
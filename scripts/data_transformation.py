@@ -1,38 +1,73 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.fft import fft, fftfreq
-from scipy.interpolate import interp1d
+from instrumentation import instrument, show
+from result_cache import memoize, cached_output_file
 
+def to_seconds(times, relative=False):
+    """
+    Converts a time column to float seconds.
+
+    Parameters:
+    times (array-like): Datetimes or numbers of seconds.
+    relative (bool): Count from the first sample instead of the Unix epoch (datetimes) or zero.
+
+    Returns:
+    np.ndarray: Seconds as float64.
+    """
+    times = np.asarray(times)
+    if np.issubdtype(times.dtype, np.datetime64):
+        # Integer nanoseconds, so relative times are subtracted at full precision
+        nanoseconds = times.astype("datetime64[ns]").astype(np.int64)
+        return (nanoseconds - nanoseconds[:1] if relative else nanoseconds) / 1e9
+    seconds = times.astype(float)
+    return seconds - seconds[:1] if relative else seconds
+
+@memoize
+def _positive_spectrum(signal, sampling_rate):
+    """
+    Returns the positive frequency bins and FFT amplitudes of a signal (cached on disk).
+    """
+    from scipy.fft import fft, fftfreq
+
+    N = len(signal)
+    yf = fft(signal)  # FFT of the signal
+    xf = fftfreq(N, 1 / sampling_rate)  # Frequency bins
+    return xf[:N // 2], np.abs(yf[:N // 2])
+
+@instrument
 def perform_fft(signal, sampling_rate, output_file="outputs/fft_analysis.png"):
     """
     Performs Fast Fourier Transform (FFT) on a signal and plots the frequency spectrum.
 
+    The spectrum and the plot are cached (see result_cache.cached_output_file).
+
     Parameters:
     signal (array): The input signal.
     sampling_rate (float): Sampling rate of the signal (Hz).
     output_file (str): Path to save the FFT plot.
     """
-    # Perform FFT
-    N = len(signal)
-    yf = fft(signal)  # FFT of the signal
-    xf = fftfreq(N, 1 / sampling_rate)  # Frequency bins
+    signal = np.asarray(signal)
+
+    def render():
+        import matplotlib.pyplot as plt
+
+        # Only plot the positive frequencies
+        positive_freqs, positive_amplitudes = _positive_spectrum(signal, sampling_rate)
+
+        # Plot FFT
+        plt.figure(figsize=(10, 6))
+        plt.plot(positive_freqs, positive_amplitudes, label="FFT Amplitude")
+        plt.title("Frequency Spectrum")
+        plt.xlabel("Frequency (Hz)")
+        plt.ylabel("Amplitude")
+        plt.grid()
+        plt.savefig(output_file)
+        plt.show()
 
-    # Only plot the positive frequencies
-    positive_freqs = xf[:N // 2]
-    positive_amplitudes = np.abs(yf[:N // 2])
-
-    # Plot FFT
-    plt.figure(figsize=(10, 6))
-    plt.plot(positive_freqs, positive_amplitudes, label="FFT Amplitude")
-    plt.title("Frequency Spectrum")
-    plt.xlabel("Frequency (Hz)")
-    plt.ylabel("Amplitude")
-    plt.grid()
-    plt.savefig(output_file)
+    cached_output_file(output_file, render, perform_fft, signal, sampling_rate, shows_figure=True)
     print(f"FFT analysis plot saved to {output_file}")
-    plt.show()
 
+@instrument
 def interpolate_missing_data(data, column):
     """
     Interpolates missing values in the specified column of a DataFrame.
@@ -65,13 +100,13 @@ if __name__ == "__main__":
 
     # Introduce missing values for testing interpolation
     data.loc[5:7, "temperature_c"] = np.nan
-    print("\nDataset with missing values:")
-    print(data.head(10))
+    show("\nDataset with missing values:")
+    show(data.head(10))
 
     # Interpolate missing data
     interpolated_data = interpolate_missing_data(data, "temperature_c")
-    print("\nDataset after interpolation:")
-    print(interpolated_data.head(10))
+    show("\nDataset after interpolation:")
+    show(interpolated_data.head(10))
 
     # Save the interpolated dataset
     interpolated_data.to_csv("outputs/interpolated_data.csv", index=False)
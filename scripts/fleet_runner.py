@@ -0,0 +1,558 @@
+import contextlib
+import glob
+import json
+import os
+import pickle
+import socket
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import numpy as np
+from instrumentation import instrument
+
+# Fleet archives are laid out as <data_root>/<spacecraft>/<YYYY-MM-DD>/<kind>.csv, e.g.
+#   fleet/sc-01/2024-11-01/housekeeping.csv
+#   fleet/sc-01/2024-11-01/orbit.csv
+
+# Work queue folders inside the work directory. A task is one JSON file that moves from
+# pending/ to running/ (claimed by a worker) and then to done/ (with its result) or failed/.
+QUEUE_STATES = ["pending", "running", "done", "failed"]
+
+def shard_statistics(data, columns=None):
+    """
+    Per-column count, mean, sum of squared deviations, minimum and maximum of one shard.
+
+    These are the sufficient statistics of the fleet summary: shards are merged exactly
+    by combine_statistics, whatever the order in which they were computed.
+
+    Parameters:
+    data (pd.DataFrame): The shard.
+    columns (list): Columns to summarize (defaults to every numeric column).
+
+    Returns:
+    dict: {"statistics": pd.DataFrame} with one row per column.
+    """
+    columns = columns or list(data.select_dtypes("number").columns)
+    rows = []
+    for column in columns:
+        values = data[column].to_numpy(dtype=float)
+        values = values[~np.isnan(values)]
+        mean = values.mean() if values.size else np.nan
+        rows.append({"column": column, "count": values.size, "mean": mean,
+                     "m2": ((values - mean) ** 2).sum() if values.size else 0.0,
+                     "min": values.min() if values.size else np.nan, "max": values.max() if values.size else np.nan})
+    return {"statistics": pd.DataFrame(rows)}
+
+def shard_z_score(data, columns, threshold=3.0, time_column="timestamp"):
+    """
+    Z-score anomalies of one shard, against the shard's own mean and standard deviation.
+
+    Parameters:
+    data (pd.DataFrame): The shard.
+    columns (list): Columns to check.
+    threshold (float): Z-score threshold for anomalies.
+    time_column (str): Column name for the timestamps.
+
+    Returns:
+    dict: {"anomalies": pd.DataFrame} with timestamp, column, value and score of each anomaly.
+    """
+    from anomaly_detection import incremental_z_score_detection
+
+    tables = []
+    for column in columns:
+        scored, _ = incremental_z_score_detection(data[[time_column, column]].copy(), column, threshold)
+        anomalies = scored[scored["z_anomaly"] == 1]
+        tables.append(pd.DataFrame({"timestamp": anomalies[time_column], "column": column,
+                                    "value": anomalies[column], "score": anomalies["z_score"]}))
+    return {"anomalies": pd.concat(tables, ignore_index=True)}
+
+def shard_isolation_forest(data, column, contamination=0.001, time_column="timestamp"):
+    """
+    Isolation Forest anomalies of one shard.
+
+    Parameters:
+    data (pd.DataFrame): The shard.
+    column (str): Column to check.
+    contamination (float): The proportion of anomalies in the shard.
+    time_column (str): Column name for the timestamps.
+
+    Returns:
+    dict: {"anomalies": pd.DataFrame} with timestamp, column and value of each anomaly.
+    """
+    from anomaly_detection import isolation_forest_labels
+
+    labels = isolation_forest_labels(data[[column]].to_numpy(), contamination)
+    anomalies = data[labels == 1]
+    return {"anomalies": pd.DataFrame({"timestamp": anomalies[time_column], "column": column,
+                                       "value": anomalies[column], "score": np.nan})}
+
+def shard_orbital_elements(data, step=60, time_column="timestamp"):
+    """
+    Keplerian elements of one orbit shard, from every step-th state vector.
+
+    Parameters:
+    data (pd.DataFrame): The shard, with x_km, y_km, z_km, vx_km_s, vy_km_s and vz_km_s columns.
+    step (int): Rows between evaluated state vectors.
+    time_column (str): Column name for the timestamps.
+
+    Returns:
+    dict: {"orbit": pd.DataFrame} with one row of elements per evaluated state vector.
+    """
+    from orbital_analysis import calculate_orbital_elements
+
+    sampled = data.iloc[::step]
+    positions = sampled[["x_km", "y_km", "z_km"]].to_numpy(dtype=float)
+    velocities = sampled[["vx_km_s", "vy_km_s", "vz_km_s"]].to_numpy(dtype=float)
+    elements = pd.DataFrame([calculate_orbital_elements(r, v) for r, v in zip(positions, velocities)])
+    elements.insert(0, "timestamp", sampled[time_column].to_numpy())
+    return {"orbit": elements}
+
+# Analyses run per (spacecraft, day): the telemetry kind each one reads, its function and
+# default parameters. Workers look analyses up here by name, so tasks stay plain JSON.
+ANALYSES = {
+    "statistics": {"kind": "housekeeping", "func": shard_statistics, "params": {}},
+    "z_score": {"kind": "housekeeping", "func": shard_z_score,
+                "params": {"columns": ["temperature_c", "power_consumption_w", "voltage_v"], "threshold": 4.0}},
+    "isolation_forest": {"kind": "housekeeping", "func": shard_isolation_forest,
+                         "params": {"column": "temperature_c", "contamination": 0.001}},
+    "orbit": {"kind": "orbit", "func": shard_orbital_elements, "params": {"step": 60}},
+}
+
+def _write_json(file_path, value):
+    """
+    Writes a JSON file atomically (temporary file renamed into place).
+    """
+    handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix=".tmp")
+    with os.fdopen(handle, "w") as f:
+        json.dump(value, f)
+    os.replace(temp_path, file_path)
+
+def _read_json(file_path):
+    with open(file_path) as f:
+        return json.load(f)
+
+def _task_path(work_dir, state, task_id, extension=".json"):
+    return os.path.join(work_dir, state, task_id + extension)
+
+def plan_tasks(data_root, analyses=None, params=None):
+    """
+    Splits a fleet archive into (spacecraft, day, analysis) tasks.
+
+    Parameters:
+    data_root (str): Folder laid out as <spacecraft>/<day>/<kind>.csv.
+    analyses (list): Names of ANALYSES to run (defaults to all of them).
+    params (dict): Analysis name -> parameters overriding the defaults.
+
+    Returns:
+    list: Task dicts (id, spacecraft, day, analysis, file, params); shards missing the kind an analysis reads are skipped.
+    """
+    analyses = analyses or list(ANALYSES)
+    params = params or {}
+    unknown = [name for name in analyses if name not in ANALYSES]
+    if unknown:
+        raise ValueError(f"Unknown analyses {unknown}. Choose from {', '.join(ANALYSES)}.")
+    tasks = []
+    for day_dir in sorted(glob.glob(os.path.join(data_root, "*", "*"))):
+        spacecraft, day = os.path.basename(os.path.dirname(day_dir)), os.path.basename(day_dir)
+        for name in analyses:
+            file_path = os.path.join(day_dir, f"{ANALYSES[name]['kind']}.csv")
+            if os.path.exists(file_path):
+                tasks.append({"id": f"{spacecraft}__{day}__{name}", "spacecraft": spacecraft, "day": day,
+                              "analysis": name, "file": file_path,
+                              "params": dict(ANALYSES[name]["params"], **params.get(name, {}))})
+    return tasks
+
+def enqueue_tasks(work_dir, tasks):
+    """
+    Adds tasks to the work queue, skipping those already queued, running, done or failed.
+
+    Re-running a fleet job with the same work directory therefore only schedules the
+    shards that have not been completed yet.
+
+    Parameters:
+    work_dir (str): Work queue folder.
+    tasks (list): Tasks from plan_tasks.
+
+    Returns:
+    int: Number of tasks added.
+    """
+    for state in QUEUE_STATES:
+        os.makedirs(os.path.join(work_dir, state), exist_ok=True)
+    known = set()
+    for state in QUEUE_STATES:
+        known.update(os.path.splitext(name)[0] for name in os.listdir(os.path.join(work_dir, state)))
+    added = 0
+    for task in tasks:
+        if task["id"] not in known:
+            _write_json(_task_path(work_dir, "pending", task["id"]), dict(task, attempts=0, errors=[]))
+            added += 1
+    return added
+
+def retry_failed(work_dir):
+    """
+    Moves the failed tasks back to the queue with a fresh attempt count.
+
+    Parameters:
+    work_dir (str): Work queue folder.
+
+    Returns:
+    int: Number of tasks requeued.
+    """
+    failed = glob.glob(os.path.join(work_dir, "failed", "*.json"))
+    for file_path in failed:
+        task = _read_json(file_path)
+        _write_json(_task_path(work_dir, "pending", task["id"]), dict(task, attempts=0))
+        os.remove(file_path)
+    return len(failed)
+
+def queue_status(work_dir):
+    """
+    Parameters:
+    work_dir (str): Work queue folder.
+
+    Returns:
+    dict: Number of tasks per queue state.
+    """
+    status = {}
+    for state in QUEUE_STATES:
+        folder = os.path.join(work_dir, state)
+        status[state] = sum(name.endswith(".json") for name in os.listdir(folder)) if os.path.isdir(folder) else 0
+    return status
+
+def _claim(work_dir):
+    """
+    Moves one pending task to running/ and returns it, or None if the queue is empty.
+
+    The rename is atomic, so when several workers race for a task exactly one succeeds.
+    """
+    for file_path in sorted(glob.glob(os.path.join(work_dir, "pending", "*.json"))):
+        running_path = os.path.join(work_dir, "running", os.path.basename(file_path))
+        try:
+            os.rename(file_path, running_path)
+        except FileNotFoundError:
+            continue  # Claimed by another worker
+        try:
+            # The rename keeps the old mtime, so requeue_stale may move the task away first
+            os.utime(running_path)
+            return _read_json(running_path), running_path
+        except FileNotFoundError:
+            continue  # Lost the claim to requeue_stale
+    return None
+
+def _requeue(work_dir, task, running_path, error, max_retries):
+    """
+    Records a failed attempt and moves the task back to pending/, or to failed/ after max_retries retries.
+    """
+    task = dict(task, attempts=task["attempts"] + 1, errors=task["errors"] + [error])
+    state = "pending" if task["attempts"] <= max_retries else "failed"
+    _write_json(_task_path(work_dir, state, task["id"]), task)
+    try:
+        os.remove(running_path)
+    except FileNotFoundError:
+        pass
+
+def requeue_stale(work_dir, lease_s=60.0, max_retries=2):
+    """
+    Requeues running tasks whose worker stopped renewing its lease (crashed or killed).
+
+    Workers touch their running task file every lease_s / 4 seconds, so a file older than
+    lease_s belongs to a worker that is gone. The lost attempt counts as a failure. Tasks
+    whose result is already in done/ are not requeued.
+
+    Parameters:
+    work_dir (str): Work queue folder.
+    lease_s (float): Seconds without renewal after which a task is considered abandoned.
+    max_retries (int): Retries before a task is moved to failed/.
+
+    Returns:
+    int: Number of tasks requeued.
+    """
+    requeued = 0
+    for running_path in glob.glob(os.path.join(work_dir, "running", "*.json")):
+        try:
+            if time.time() - os.path.getmtime(running_path) < lease_s:
+                continue
+            task = _read_json(running_path)
+        except FileNotFoundError:
+            continue  # Finished meanwhile
+        if os.path.exists(_task_path(work_dir, "done", task["id"], ".pkl")):
+            # The worker finished just before its lease ran out and is removing this file
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(running_path)
+            continue
+        _requeue(work_dir, task, running_path, "worker lost", max_retries)
+        requeued += 1
+    return requeued
+
+def _renew_lease(running_path, interval_s, stop):
+    while not stop.wait(interval_s):
+        try:
+            os.utime(running_path)
+        except FileNotFoundError:
+            return
+
+@instrument
+def run_task(task):
+    """
+    Runs one (spacecraft, day, analysis) task.
+
+    Parameters:
+    task (dict): Task from plan_tasks.
+
+    Returns:
+    dict: Table name -> pd.DataFrame.
+    """
+    from data_ingestion import csv_engine
+
+    data = pd.read_csv(task["file"], parse_dates=["timestamp"], engine=csv_engine())
+    return ANALYSES[task["analysis"]]["func"](data, **task["params"])
+
+def worker_loop(work_dir, max_retries=2, lease_s=60.0, worker_id=None):
+    """
+    Claims and runs tasks from the work queue until it is empty.
+
+    Any number of workers, started by run_fleet or separately (spacecraft_cli.py
+    fleet-worker), can share a work directory. Each result is written to done/ before
+    the task leaves running/, so an interrupted job resumes where it stopped.
+
+    Parameters:
+    work_dir (str): Work queue folder.
+    max_retries (int): Retries of a failing task before it is moved to failed/.
+    lease_s (float): Lease of a running task (see requeue_stale).
+    worker_id (str): Name recorded with the results (defaults to host:pid).
+
+    Returns:
+    dict: Number of tasks completed and failed attempts by this worker.
+    """
+    from instrumentation import configure
+
+    configure(quiet=True)
+    try:
+        # One BLAS/OpenMP thread per worker, so N workers use N cores without oversubscription
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+    except ImportError:
+        pass
+
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    counts = {"worker": worker_id, "completed": 0, "errors": 0}
+    while True:
+        claimed = _claim(work_dir)
+        if claimed is None and requeue_stale(work_dir, lease_s, max_retries):
+            continue
+        if claimed is None:
+            return counts
+        task, running_path = claimed
+        stop = threading.Event()
+        lease = threading.Thread(target=_renew_lease, args=(running_path, lease_s / 4, stop), daemon=True)
+        lease.start()
+        start = time.perf_counter()
+        try:
+            tables = run_task(task)
+        except Exception:
+            counts["errors"] += 1
+            _requeue(work_dir, task, running_path, traceback.format_exc(limit=3), max_retries)
+            continue
+        finally:
+            stop.set()
+            lease.join()
+        result = {"task": task, "worker": worker_id, "duration_s": time.perf_counter() - start, "tables": tables}
+        handle, temp_path = tempfile.mkstemp(dir=os.path.join(work_dir, "done"), suffix=".tmp")
+        with os.fdopen(handle, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, _task_path(work_dir, "done", task["id"], ".pkl"))
+        _write_json(_task_path(work_dir, "done", task["id"]), dict(task, worker=worker_id))
+        # requeue_stale may have moved the file if the lease ran out just as the task finished
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(running_path)
+        counts["completed"] += 1
+
+def circular_mean_deg(angles):
+    """
+    Mean direction of angles, so that e.g. 359 and 1 degrees average to 0 rather than 180.
+
+    Parameters:
+    angles (array-like): Angles (degrees).
+
+    Returns:
+    float: Mean angle in [0, 360) degrees.
+    """
+    radians = np.radians(np.asarray(angles, dtype=float))
+    mean = np.degrees(np.arctan2(np.sin(radians).mean(), np.cos(radians).mean())) % 360
+    # Tiny negative means wrap to exactly 360.0 in floating point
+    return 0.0 if mean == 360.0 else mean
+
+def combine_statistics(statistics):
+    """
+    Merges per-shard statistics into overall count, mean, standard deviation, minimum and maximum.
+
+    Parameters:
+    statistics (pd.DataFrame): Shard statistics (count, mean, m2, min, max) with grouping columns.
+
+    Returns:
+    pd.DataFrame: One row per spacecraft and column, plus "fleet" rows over all spacecraft.
+    """
+    def merge(group):
+        count = group["count"].sum()
+        mean = (group["count"] * group["mean"]).sum() / count if count else np.nan
+        # Parallel combination of the sums of squared deviations (Chan et al.)
+        m2 = group["m2"].sum() + (group["count"] * (group["mean"] - mean) ** 2).sum()
+        return pd.Series({"count": count, "mean": mean, "std": np.sqrt(m2 / (count - 1)) if count > 1 else np.nan,
+                          "min": group["min"].min(), "max": group["max"].max(), "shards": len(group)})
+
+    statistics = statistics.fillna({"mean": 0.0})
+    per_spacecraft = statistics.groupby(["spacecraft", "column"])[["count", "mean", "m2", "min", "max"]].apply(merge)
+    fleet = statistics.groupby("column")[["count", "mean", "m2", "min", "max"]].apply(merge)
+    fleet.index = pd.MultiIndex.from_product([["fleet"], fleet.index], names=["spacecraft", "column"])
+    combined = pd.concat([per_spacecraft, fleet]).reset_index()
+    # pd.Series rows hold floats only
+    return combined.astype({"count": "int64", "shards": "int64"})
+
+@instrument
+def combine_results(work_dir, output_dir="outputs/fleet"):
+    """
+    Combines the per-shard results of a work directory into fleet tables.
+
+    Writes anomalies.csv (every anomaly, tagged with spacecraft, day and method),
+    shard_statistics.csv and statistics.csv (merged per spacecraft and over the fleet),
+    orbit.csv (orbital elements) and orbit_summary.csv (per spacecraft and day).
+
+    Parameters:
+    work_dir (str): Work queue folder.
+    output_dir (str): Folder to save the fleet tables.
+
+    Returns:
+    dict: Table name -> pd.DataFrame.
+    """
+    tables = {}
+    for file_path in sorted(glob.glob(os.path.join(work_dir, "done", "*.pkl"))):
+        with open(file_path, "rb") as f:
+            result = pickle.load(f)
+        task = result["task"]
+        for name, table in result["tables"].items():
+            table = table.copy()
+            table.insert(0, "analysis", task["analysis"])
+            table.insert(0, "day", task["day"])
+            table.insert(0, "spacecraft", task["spacecraft"])
+            tables.setdefault(name, []).append(table)
+    combined = {name: pd.concat(frames, ignore_index=True) for name, frames in tables.items()}
+
+    if "statistics" in combined:
+        combined["shard_statistics"] = combined.pop("statistics")
+        combined["statistics"] = combine_statistics(combined["shard_statistics"])
+    if "orbit" in combined:
+        combined["orbit"] = combined["orbit"].sort_values(["spacecraft", "timestamp"], ignore_index=True)
+        combined["orbit_summary"] = combined["orbit"].groupby(["spacecraft", "day"]).agg(
+            semi_major_axis_km=("semi_major_axis", "mean"),
+            eccentricity=("eccentricity", "mean"),
+            # Inclination lies in [0, 180] and does not wrap; RAAN wraps at 360
+            inclination_deg=("inclination", "mean"),
+            raan_deg=("raan", circular_mean_deg),
+            samples=("semi_major_axis", "size"),
+        ).reset_index()
+    if "anomalies" in combined:
+        combined["anomalies"] = combined["anomalies"].rename(columns={"analysis": "method"}).sort_values(
+            ["spacecraft", "timestamp"], ignore_index=True)
+
+    os.makedirs(output_dir, exist_ok=True)
+    for name, table in combined.items():
+        table.to_csv(os.path.join(output_dir, f"{name}.csv"), index=False)
+    print(f"Fleet tables ({', '.join(combined)}) saved to {output_dir}")
+    return combined
+
+def run_fleet(data_root, work_dir="outputs/fleet_work", output_dir="outputs/fleet", analyses=None, params=None,
+              workers=None, max_retries=2, lease_s=60.0):
+    """
+    Runs every analysis for every spacecraft and day of a fleet archive on a local process pool.
+
+    Tasks are queued in work_dir (see worker_loop), so the job can be interrupted and
+    resumed, and extra workers started with spacecraft_cli.py fleet-worker can join it.
+    Shards are independent, so throughput grows with the number of workers until the
+    disk becomes the bottleneck.
+
+    Parameters:
+    data_root (str): Folder laid out as <spacecraft>/<day>/<kind>.csv.
+    work_dir (str): Work queue folder.
+    output_dir (str): Folder to save the fleet tables.
+    analyses (list): Names of ANALYSES to run (defaults to all of them).
+    params (dict): Analysis name -> parameters overriding the defaults.
+    workers (int): Worker processes (defaults to the number of CPUs).
+    max_retries (int): Retries of a failing task before it is given up.
+    lease_s (float): Lease of a running task (see requeue_stale).
+
+    Returns:
+    dict: Table name -> pd.DataFrame, as returned by combine_results.
+    """
+    added = enqueue_tasks(work_dir, plan_tasks(data_root, analyses, params))
+    status = queue_status(work_dir)
+    print(f"{added} tasks queued; queue: {status}")
+    workers = min(workers or os.cpu_count() or 1, max(1, status["pending"] + status["running"]))
+
+    start = time.perf_counter()
+    while True:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(worker_loop, work_dir, max_retries, lease_s) for _ in range(workers)]
+        for future in futures:
+            try:
+                print(f"Worker {future.result()}")
+            except Exception as exc:  # A worker process died; its task is recovered below
+                print(f"Worker lost: {exc!r}")
+        status = queue_status(work_dir)
+        if not status["pending"] and not status["running"]:
+            break
+        # Tasks left running by dead workers (or still held by external workers)
+        time.sleep(lease_s / 4)
+        requeue_stale(work_dir, lease_s, max_retries)
+
+    elapsed = time.perf_counter() - start
+    print(f"Queue: {status}; {elapsed:.1f} s with {workers} workers")
+    for file_path in glob.glob(os.path.join(work_dir, "failed", "*.json")):
+        task = _read_json(file_path)
+        print(f"Task {task['id']} failed after {task['attempts']} attempts:\n{task['errors'][-1]}")
+    return combine_results(work_dir, output_dir)
+
+def write_synthetic_fleet(data_root, spacecraft=4, days=2, rows_per_day=86400, kinds=("housekeeping", "orbit")):
+    """
+    Writes a synthetic fleet archive (one seeded CSV per spacecraft, day and kind).
+
+    Parameters:
+    data_root (str): Folder to create the archive in.
+    spacecraft (int): Number of spacecraft.
+    days (int): Number of days per spacecraft.
+    rows_per_day (int): Rows per file (86400 is 1 Hz).
+    kinds (tuple): Telemetry kinds written per day.
+    """
+    from synthetic_telemetry import write_synthetic_csv
+
+    for vehicle in range(spacecraft):
+        for day in pd.date_range("2024-11-01", periods=days, freq="D"):
+            for kind in kinds:
+                write_synthetic_csv(kind, rows_per_day,
+                                    os.path.join(data_root, f"sc-{vehicle + 1:02d}", f"{day:%Y-%m-%d}", f"{kind}.csv"),
+                                    seed=vehicle * 1000 + day.dayofyear, start=str(day),
+                                    cadence_s=86400 / rows_per_day, orbit_period_s=5400.0 + 60 * vehicle)
+
+if __name__ == "__main__":
+    import shutil
+    from instrumentation import show
+
+    # Recompute everything, so both runs below do the same work
+    os.environ["SPACECRAFT_CACHE"] = "0"
+    data_root, work_dir = "outputs/synthetic_fleet", "outputs/fleet_work"
+    if not os.path.isdir(data_root):
+        write_synthetic_fleet(data_root, spacecraft=4, days=2)
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+    # Throughput with one worker, then with every core
+    run_fleet(data_root, work_dir, workers=1)
+    shutil.rmtree(work_dir)
+    tables = run_fleet(data_root, work_dir)
+    show(tables["statistics"])
+    show(tables["orbit_summary"])
+    print(f"{len(tables['anomalies'])} anomalies across the fleet")
+
+    # Re-running resumes: completed shards are not recomputed
+    run_fleet(data_root, work_dir)
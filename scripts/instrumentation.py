@@ -0,0 +1,215 @@
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Settings can also be given through the environment, e.g. for cron jobs:
+#   SPACECRAFT_METRICS_FILE=outputs/metrics.jsonl  write one JSON line per instrumented call
+#   SPACECRAFT_QUIET=1                             suppress DataFrame dumps and other verbose output
+#   SPACECRAFT_TRACK_ALLOCATIONS=1                 record peak Python/NumPy allocations (slower)
+_settings = {
+    "metrics_file": os.environ.get("SPACECRAFT_METRICS_FILE") or None,
+    "quiet": os.environ.get("SPACECRAFT_QUIET", "") not in ("", "0"),
+    "track_allocations": os.environ.get("SPACECRAFT_TRACK_ALLOCATIONS", "") not in ("", "0"),
+}
+_write_lock = threading.Lock()
+_local = threading.local()
+_call_ids = itertools.count(1)
+
+def configure(metrics_file=None, quiet=None, track_allocations=None):
+    """
+    Changes the instrumentation settings; arguments left as None are unchanged.
+
+    Parameters:
+    metrics_file (str): JSON-lines file receiving one record per instrumented call ("" disables metrics).
+    quiet (bool): Suppress verbose output such as DataFrame dumps.
+    track_allocations (bool): Record peak traced allocations per call with tracemalloc.
+    """
+    if metrics_file is not None:
+        _settings["metrics_file"] = metrics_file or None
+    if quiet is not None:
+        _settings["quiet"] = quiet
+    if track_allocations is not None:
+        _settings["track_allocations"] = track_allocations
+        if track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+def is_quiet():
+    """
+    Returns True when verbose output is suppressed.
+    """
+    return _settings["quiet"]
+
+def show(*objects, **print_kwargs):
+    """
+    Prints verbose output (DataFrames, long summaries) unless quiet mode is on.
+
+    Objects are only formatted when they are actually printed, so large frames cost
+    nothing in quiet mode.
+
+    Parameters:
+    objects: Values to print.
+    print_kwargs: Keyword arguments passed to print (sep, end).
+    """
+    if not _settings["quiet"]:
+        print(*objects, **print_kwargs)
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return usage / 2**20 if os.uname().sysname == "Darwin" else usage / 2**10
+
+def _count_rows(args, kwargs):
+    for value in list(args) + list(kwargs.values()):
+        if hasattr(value, "shape") and getattr(value, "ndim", 0) >= 1:
+            return int(value.shape[0])
+    return None
+
+def _write_record(record):
+    with _write_lock:
+        directory = os.path.dirname(_settings["metrics_file"])
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(_settings["metrics_file"], "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+def instrument(func):
+    """
+    Decorator recording wall time, CPU time, memory and rows processed per call.
+
+    When no metrics file is configured the wrapper only checks a flag and calls the
+    function. Each record carries its call id, the id of the enclosing instrumented call
+    (parent_id, None at top level) and its depth, and self_wall_s / self_cpu_s exclude
+    the time spent in nested instrumented calls, so nested calls are not counted twice
+    when records are added up. Peak allocations are measured with tracemalloc, which is
+    process-wide, so calls running concurrently in other threads are included in each
+    other's peaks.
+
+    Parameters:
+    func (callable): Function to instrument.
+
+    Returns:
+    callable: The wrapped function.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _settings["metrics_file"] is None:
+            return func(*args, **kwargs)
+
+        calls = getattr(_local, "calls", None)
+        if calls is None:
+            calls = _local.calls = []
+        call = {"id": f"{os.getpid()}-{next(_call_ids)}", "child_wall": 0.0, "child_cpu": 0.0}
+        parent_id = calls[-1]["id"] if calls else None
+        calls.append(call)
+
+        tracking = _settings["track_allocations"] and tracemalloc.is_tracing()
+        stack = getattr(_local, "peaks", None)
+        if stack is None:
+            stack = _local.peaks = []
+        if tracking:
+            # Keep the enclosing call's peak before resetting it for this call
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1] = max(stack[-1], peak)
+            stack.append(current)
+            start_traced = current
+            tracemalloc.reset_peak()
+
+        error = None
+        rss_before = _max_rss_mb()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            return func(*args, **kwargs)
+        except Exception as exc:
+            error = type(exc).__name__
+            raise
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            calls.pop()
+            if calls:
+                calls[-1]["child_wall"] += wall
+                calls[-1]["child_cpu"] += cpu
+            peak_alloc_mb = None
+            if tracking:
+                peak = max(stack.pop(), tracemalloc.get_traced_memory()[1])
+                peak_alloc_mb = (peak - start_traced) / 2**20
+                if stack:
+                    stack[-1] = max(stack[-1], peak)
+            rows = _count_rows(args, kwargs)
+            rss_after = _max_rss_mb()
+            _write_record({
+                "function": name,
+                "call_id": call["id"],
+                "parent_id": parent_id,
+                "depth": len(calls),
+                "start": time.time() - wall,
+                "wall_s": wall,
+                "cpu_s": cpu,
+                "self_wall_s": wall - call["child_wall"],
+                "self_cpu_s": cpu - call["child_cpu"],
+                "rows": rows,
+                "rows_per_s": rows / wall if rows and wall > 0 else None,
+                "max_rss_mb": rss_after,
+                "rss_growth_mb": rss_after - rss_before if rss_after is not None else None,
+                "peak_alloc_mb": peak_alloc_mb,
+                "error": error,
+            })
+
+    return wrapper
+
+def summarize_metrics(metrics_file):
+    """
+    Summarizes a metrics file per function.
+
+    total_wall_s includes nested instrumented calls (e.g. integrate_energy inside
+    simulate_battery_soc) and self_wall_s excludes them, so the self times add up to the
+    instrumented time without double counting. The overall line counts top-level calls only.
+
+    Parameters:
+    metrics_file (str): JSON-lines file written by instrumented calls.
+
+    Returns:
+    pd.DataFrame: Calls, total/self/mean wall time, total/self CPU time, rows and peak
+    memory per function.
+    """
+    import pandas as pd
+
+    metrics = pd.read_json(metrics_file, lines=True)
+    # Files written before calls were nested carry no depth or self times
+    for column, default in (("depth", 0), ("self_wall_s", "wall_s"), ("self_cpu_s", "cpu_s")):
+        if column not in metrics.columns:
+            metrics[column] = metrics[default] if isinstance(default, str) else default
+    summary = metrics.groupby("function").agg(
+        calls=("wall_s", "size"),
+        total_wall_s=("wall_s", "sum"),
+        self_wall_s=("self_wall_s", "sum"),
+        mean_wall_s=("wall_s", "mean"),
+        total_cpu_s=("cpu_s", "sum"),
+        self_cpu_s=("self_cpu_s", "sum"),
+        rows=("rows", "sum"),
+        max_rss_mb=("max_rss_mb", "max"),
+        peak_alloc_mb=("peak_alloc_mb", "max"),
+        errors=("error", "count"),
+    ).sort_values("self_wall_s", ascending=False)
+    print(summary)
+    top_level = metrics[metrics["depth"] == 0]
+    print(f"\n{len(top_level)} top-level calls: {top_level['wall_s'].sum():.3f} s wall, "
+          f"{top_level['cpu_s'].sum():.3f} s CPU, {int(top_level['rows'].fillna(0).sum())} rows")
+    return summary
+
+if _settings["track_allocations"] and not tracemalloc.is_tracing():
+    tracemalloc.start()
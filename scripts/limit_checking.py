@@ -0,0 +1,140 @@
+import os
+import pandas as pd
+import numpy as np
+from instrumentation import instrument, show
+
+LIMIT_COLUMNS = ["red_low", "yellow_low", "yellow_high", "red_high"]
+
+@instrument
+def load_limits(file_path):
+    """
+    Loads a limits table.
+
+    The table has one row per channel with red/yellow low/high limits. An optional
+    "mode" column holds mode-dependent overrides; rows with an empty mode are the
+    default limits. Empty cells of a default row are not checked; empty cells of a
+    mode row keep the default limit in that mode.
+
+    Parameters:
+    file_path (str): Path to the limits CSV file.
+
+    Returns:
+    pd.DataFrame: The limits table.
+    """
+    limits = pd.read_csv(file_path)
+    if "mode" not in limits.columns:
+        limits["mode"] = ""
+    limits["mode"] = limits["mode"].fillna("").astype(str)
+    print(f"Loaded {len(limits)} limit rows for {limits['channel'].nunique()} channels from {file_path}")
+    return limits
+
+def _limit_tensor(limits, channels):
+    """
+    Arranges the limits table as an array of shape (modes + 1, 4, channels).
+
+    Index 0 holds the default limits; index i + 1 holds the limits in force for
+    modes[i], i.e. the defaults overridden by the non-empty cells of that mode's rows.
+    """
+    modes = sorted(mode for mode in limits["mode"].unique() if mode)
+    tensor = np.full((len(modes) + 1, len(LIMIT_COLUMNS), len(channels)), np.nan)
+    position = {channel: i for i, channel in enumerate(channels)}
+
+    defaults = limits[(limits["mode"] == "") & limits["channel"].isin(position)]
+    tensor[0][:, defaults["channel"].map(position).values] = defaults[LIMIT_COLUMNS].to_numpy(dtype=float).T
+    for i, mode in enumerate(modes, start=1):
+        tensor[i] = tensor[0]
+        overrides = limits[(limits["mode"] == mode) & limits["channel"].isin(position)]
+        columns = overrides["channel"].map(position).values
+        values = overrides[LIMIT_COLUMNS].to_numpy(dtype=float).T
+        # Empty cells of an override row keep the default limit
+        tensor[i][:, columns] = np.where(np.isnan(values), tensor[0][:, columns], values)
+    return tensor, modes
+
+@instrument
+def check_limits(data, limits, time_column="timestamp", mode_column=None, block_cells=4000000,
+                 output_file="outputs/anomalies/limit_violations.csv"):
+    """
+    Evaluates every channel against its limits with broadcasted comparisons over the 2-D value array.
+
+    Parameters:
+    data (pd.DataFrame): Telemetry with one column per channel.
+    limits (pd.DataFrame): Limits table from load_limits.
+    time_column (str): Column name for time.
+    mode_column (str): Column holding the spacecraft mode per sample, or None to use default limits only.
+    block_cells (int): Approximate number of values compared per block, bounding temporary memory.
+    output_file (str): Path to save the violations (None to skip saving).
+
+    Returns:
+    pd.DataFrame: Sparse violation table with one row per (sample, channel) outside its limits:
+    timestamp, channel, value, severity ("red" or "yellow"), side ("low" or "high") and the violated limit.
+    """
+    channels = [channel for channel in limits["channel"].unique() if channel in data.columns]
+    tensor, modes = _limit_tensor(limits, channels)
+    values = data[channels].to_numpy(dtype=float)
+    block_rows = max(1, block_cells // max(1, len(channels)))
+
+    if mode_column is not None:
+        # Unknown modes (-1) fall back to the default limits at index 0
+        mode_index = pd.Index(modes).get_indexer(data[mode_column]) + 1
+    else:
+        mode_index = np.zeros(len(data), dtype=np.intp)
+
+    rows, cols, codes, bounds = [], [], [], []
+    for mode in np.unique(mode_index):
+        red_low, yellow_low, yellow_high, red_high = tensor[mode]
+        mode_rows = np.flatnonzero(mode_index == mode)
+        for start in range(0, len(mode_rows), block_rows):
+            block_index = mode_rows[start:start + block_rows]
+            block = values[block_index]
+
+            # 4 = red high, 3 = red low, 2 = yellow high, 1 = yellow low, 0 = within limits
+            code = np.select(
+                [block > red_high, block < red_low, block > yellow_high, block < yellow_low],
+                [4, 3, 2, 1], default=0,
+            ).astype(np.int8)
+            r, c = np.nonzero(code)
+            found = code[r, c]
+            rows.append(block_index[r])
+            cols.append(c)
+            codes.append(found)
+            bounds.append(tensor[mode][[1, 2, 0, 3]][found - 1, c])
+
+    rows = np.concatenate(rows).astype(np.intp) if rows else np.empty(0, dtype=np.intp)
+    cols = np.concatenate(cols).astype(np.intp) if cols else np.empty(0, dtype=np.intp)
+    codes = np.concatenate(codes) if codes else np.empty(0, dtype=np.int8)
+    bounds = np.concatenate(bounds) if bounds else np.empty(0)
+    order = np.lexsort((cols, rows))
+    rows, cols, codes, bounds = rows[order], cols[order], codes[order], bounds[order]
+
+    violations = pd.DataFrame({
+        time_column: data[time_column].values[rows] if time_column in data.columns else rows,
+        "channel": pd.Categorical.from_codes(cols, categories=channels),
+        "value": values[rows, cols],
+        "severity": np.where(codes >= 3, "red", "yellow"),
+        "side": np.where(codes % 2 == 0, "high", "low"),
+        "limit": bounds,
+    })
+
+    by_severity = violations["severity"].value_counts()
+    show(f"\nLimit Check: {len(channels)} channels, {violations['channel'].nunique()} in violation "
+          f"({by_severity.get('red', 0)} red, {by_severity.get('yellow', 0)} yellow samples)")
+
+    if output_file is not None:
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        violations.to_csv(output_file, index=False)
+        print(f"Limit violations saved to {output_file}")
+    return violations
+
+if __name__ == "__main__":
+    # Load the dataset and the limits table
+    file_path = "data/sample_power_data.csv"
+    data = pd.read_csv(file_path, parse_dates=["timestamp"])
+    limits = load_limits("data/sample_limits.csv")
+
+    # Mark an eclipse period in which the spacecraft runs in safe mode
+    data["mode"] = "nominal"
+    data.loc[5:6, "mode"] = "safe"
+
+    # Check all channels at once
+    violations = check_limits(data, limits, mode_column="mode")
+    show(violations)
@@ -0,0 +1,483 @@
+import asyncio
+import struct
+import pandas as pd
+import numpy as np
+from instrumentation import show
+
+# Every frame is a little-endian uint32 payload length followed by the payload. The payload
+# is a whole number of fixed-size records: int64 timestamp (ns since the epoch) followed by
+# one float64 per channel, in the channel order agreed by sender and service. Over TCP the
+# frames follow each other on the stream; over UDP each datagram carries one frame.
+FRAME_HEADER = struct.Struct("<I")
+
+def packet_dtype(channels):
+    """
+    Returns the NumPy record layout of one telemetry sample.
+
+    Parameters:
+    channels (list): Channel names, in packet order.
+
+    Returns:
+    np.dtype: Structured dtype with a timestamp field and one float64 field per channel.
+    """
+    return np.dtype([("timestamp", "<i8")] + [(channel, "<f8") for channel in channels])
+
+def encode_records(data, channels, time_column="timestamp"):
+    """
+    Packs telemetry rows into packet records.
+
+    Parameters:
+    data (pd.DataFrame): The telemetry.
+    channels (list): Channels to pack, in packet order.
+    time_column (str): Column name for the timestamps.
+
+    Returns:
+    np.ndarray: Structured array of packet records.
+    """
+    records = np.empty(len(data), dtype=packet_dtype(channels))
+    records["timestamp"] = pd.to_datetime(data[time_column]).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    for channel in channels:
+        records[channel] = data[channel].to_numpy(dtype=float)
+    return records
+
+def encode_frame(records):
+    """
+    Builds one frame (length header and payload) from packet records.
+
+    Parameters:
+    records (np.ndarray): Structured array of packet records.
+
+    Returns:
+    bytes: The frame.
+    """
+    payload = records.tobytes()
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+def decode_frames(payloads, dtype):
+    """
+    Decodes a batch of frame payloads into one DataFrame with a single copy.
+
+    Parameters:
+    payloads (list): Frame payloads (bytes, without the length header).
+    dtype (np.dtype): Packet record layout from packet_dtype.
+
+    Returns:
+    pd.DataFrame: timestamp column followed by one column per channel.
+    """
+    records = np.frombuffer(b"".join(payloads), dtype=dtype)
+    data = pd.DataFrame({name: records[name] for name in dtype.names[1:]})
+    data.insert(0, "timestamp", records["timestamp"].astype("datetime64[ns]"))
+    return data
+
+class _DatagramReceiver(asyncio.DatagramProtocol):
+    """
+    Puts UDP frames on the service's frame queue; UDP has no flow control, so frames
+    arriving while the queue is full are dropped and counted.
+    """
+
+    def __init__(self, service):
+        self.service = service
+
+    def datagram_received(self, datagram, address):
+        if len(datagram) < FRAME_HEADER.size or FRAME_HEADER.unpack_from(datagram)[0] != len(datagram) - FRAME_HEADER.size:
+            self.service.stats["malformed_frames"] += 1
+            return
+        self.service._enqueue_nowait(datagram[FRAME_HEADER.size:])
+
+class LiveTelemetryService:
+    """
+    Asyncio service receiving framed telemetry over TCP and/or UDP and analysing it incrementally.
+
+    Frames are collected into batches of up to batch_records samples, or whatever has
+    arrived max_latency_s after the first frame of the batch. Each batch is decoded with
+    one np.frombuffer call and run through the incremental z-score, threshold, limit and
+    energy-balance checks in a worker thread, so the event loop keeps receiving meanwhile.
+    Results go to every subscriber queue. Queues are bounded: a full subscriber queue
+    stalls the service, which stops reading from TCP connections (the senders then block
+    in TCP flow control) and drops UDP frames once the frame queue is full. Subscribers
+    created with drop_oldest=True lose their oldest results instead of stalling the others.
+
+    Frames longer than max_frame_bytes are counted as malformed and their TCP connection
+    is closed. Each batch is sorted by time, and records older than the newest one already
+    processed are dropped and counted as late_records, so the ring buffer and the
+    incremental checks only ever move forward in time. A batch whose analysis raises is
+    counted in failed_batches and skipped; the service keeps running.
+    """
+
+    def __init__(self, channels, z_score_columns=(), z_threshold=3.0, thresholds=None, limits=None,
+                 energy_columns=None, batch_records=256, max_latency_s=0.25, queue_size=1024, buffer=None,
+                 max_frame_bytes=None):
+        """
+        Parameters:
+        channels (list): Channel names, in packet order.
+        z_score_columns (list): Channels checked with incremental_z_score_detection.
+        z_threshold (float): Z-score threshold for anomalies.
+        thresholds (dict): Channel -> upper threshold for threshold-based detection.
+        limits (pd.DataFrame): Limits table (see limit_checking.load_limits) checked on every batch.
+        energy_columns (tuple): (generation column, consumption column) integrated with integrate_energy.
+        batch_records (int): Maximum samples per batch.
+        max_latency_s (float): Maximum time a received frame waits for its batch to fill (s).
+        queue_size (int): Capacity of the received-frame queue.
+        buffer (TelemetryRingBuffer): Ring buffer receiving every decoded batch, for live windows.
+        max_frame_bytes (int): Largest accepted frame payload (defaults to 64 full batches).
+        """
+        self.channels = list(channels)
+        self.dtype = packet_dtype(self.channels)
+        self.z_score_columns = list(z_score_columns)
+        self.z_threshold = z_threshold
+        self.thresholds = dict(thresholds or {})
+        self.limits = limits
+        self.energy_columns = energy_columns
+        self.batch_records = batch_records
+        self.max_latency_s = max_latency_s
+        self.buffer = buffer
+        self.max_frame_bytes = max_frame_bytes or 64 * batch_records * self.dtype.itemsize
+        self.stats = {"frames": 0, "records": 0, "batches": 0, "dropped_frames": 0, "malformed_frames": 0,
+                      "late_records": 0, "failed_batches": 0, "dropped_results": 0, "max_latency_s": 0.0}
+        self._frames = asyncio.Queue(maxsize=queue_size)
+        self._subscribers = []
+        self._servers = []
+        self._transports = []
+        self._z_states = {}
+        self._energy_state = None
+        self._newest = None
+
+    def subscribe(self, maxsize=16, drop_oldest=False):
+        """
+        Registers a subscriber.
+
+        Parameters:
+        maxsize (int): Capacity of the subscriber's queue.
+        drop_oldest (bool): Drop the oldest queued result when full instead of applying backpressure.
+
+        Returns:
+        asyncio.Queue: Queue receiving one result dict per batch, then None when the service stops.
+        """
+        queue = asyncio.Queue(maxsize=maxsize)
+        self._subscribers.append((queue, drop_oldest))
+        return queue
+
+    def _enqueue_nowait(self, payload):
+        if len(payload) % self.dtype.itemsize or len(payload) > self.max_frame_bytes:
+            self.stats["malformed_frames"] += 1
+            return
+        try:
+            self._frames.put_nowait((asyncio.get_running_loop().time(), payload))
+        except asyncio.QueueFull:
+            self.stats["dropped_frames"] += 1
+
+    async def _handle_connection(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                header = await reader.readexactly(FRAME_HEADER.size)
+                length = FRAME_HEADER.unpack(header)[0]
+                if length > self.max_frame_bytes:
+                    # The stream cannot be resynchronised after a bad header, so drop the connection
+                    self.stats["malformed_frames"] += 1
+                    break
+                payload = await reader.readexactly(length)
+                if len(payload) % self.dtype.itemsize:
+                    self.stats["malformed_frames"] += 1
+                    continue
+                # Waiting here when the queue is full is what pushes back on the sender
+                await self._frames.put((loop.time(), payload))
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+    async def start_tcp(self, host="127.0.0.1", port=0):
+        """
+        Starts accepting TCP connections.
+
+        Parameters:
+        host (str): Address to listen on.
+        port (int): Port to listen on (0 picks a free port).
+
+        Returns:
+        int: The bound port.
+        """
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        self._servers.append(server)
+        port = server.sockets[0].getsockname()[1]
+        print(f"Listening for TCP telemetry on {host}:{port}")
+        return port
+
+    async def start_udp(self, host="127.0.0.1", port=0):
+        """
+        Starts receiving UDP datagrams.
+
+        Parameters:
+        host (str): Address to listen on.
+        port (int): Port to listen on (0 picks a free port).
+
+        Returns:
+        int: The bound port.
+        """
+        transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            lambda: _DatagramReceiver(self), local_addr=(host, port))
+        self._transports.append(transport)
+        port = transport.get_extra_info("sockname")[1]
+        print(f"Listening for UDP telemetry on {host}:{port}")
+        return port
+
+    def _analyze(self, batch):
+        """
+        Runs the incremental checks on one decoded batch.
+        """
+        from anomaly_detection import incremental_z_score_detection
+
+        results = {"batch": batch}
+        z_anomalies = []
+        for column in self.z_score_columns:
+            scored, self._z_states[column] = incremental_z_score_detection(
+                batch[["timestamp", column]].copy(), column, self.z_threshold, state=self._z_states.get(column))
+            z_anomalies.append(scored[scored["z_anomaly"] == 1].assign(channel=column)
+                               .rename(columns={column: "value"}))
+        if z_anomalies:
+            results["z_anomalies"] = pd.concat(z_anomalies, ignore_index=True)
+
+        if self.thresholds:
+            results["threshold_anomalies"] = pd.concat(
+                [batch.loc[batch[column] > threshold, ["timestamp", column]].rename(columns={column: "value"})
+                 .assign(channel=column) for column, threshold in self.thresholds.items()], ignore_index=True)
+
+        if self.limits is not None:
+            from limit_checking import check_limits
+            results["limit_violations"] = check_limits(batch, self.limits, output_file=None)
+
+        if self.energy_columns is not None:
+            from power_system_monitoring import integrate_energy
+            results["energy"], self._energy_state = integrate_energy(batch, *self.energy_columns,
+                                                                     state=self._energy_state)
+        return results
+
+    async def _publish(self, results):
+        for queue, drop_oldest in self._subscribers:
+            if drop_oldest:
+                while queue.full():
+                    queue.get_nowait()
+                    self.stats["dropped_results"] += 1
+                queue.put_nowait(results)
+            else:
+                await queue.put(results)
+
+    def _order(self, batch):
+        """
+        Sorts a decoded batch by time and drops the records older than the newest one
+        already processed.
+        """
+        if not batch["timestamp"].is_monotonic_increasing:
+            batch = batch.sort_values("timestamp", kind="stable", ignore_index=True)
+        if self._newest is not None:
+            late = (batch["timestamp"] < self._newest).to_numpy()
+            if late.any():
+                self.stats["late_records"] += int(late.sum())
+                batch = batch[~late].reset_index(drop=True)
+        if len(batch):
+            self._newest = batch["timestamp"].iloc[-1]
+        return batch
+
+    async def _process(self, frames):
+        loop = asyncio.get_running_loop()
+        self.stats["frames"] += len(frames)
+        batch = self._order(decode_frames([payload for _, payload in frames], self.dtype))
+        if batch.empty:
+            return
+        try:
+            if self.buffer is not None:
+                self.buffer.append_frame(batch)
+            results = await asyncio.to_thread(self._analyze, batch)
+        except Exception as exc:
+            self.stats["failed_batches"] += 1
+            print(f"Skipping a batch of {len(batch)} samples: {type(exc).__name__}: {exc}")
+            return
+        results["latency_s"] = loop.time() - frames[0][0]
+        self.stats["records"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["max_latency_s"] = max(self.stats["max_latency_s"], results["latency_s"])
+        await self._publish(results)
+
+    async def run(self):
+        """
+        Batches, analyses and publishes received frames until stop() is called.
+        """
+        try:
+            await self._run_batches()
+        finally:
+            for queue, _ in self._subscribers:
+                await queue.put(None)
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._frames.get()
+            if item is None:
+                break
+            frames = [item]
+            records = len(item[1]) // self.dtype.itemsize
+            deadline = item[0] + self.max_latency_s
+            while records < self.batch_records:
+                try:
+                    item = self._frames.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._frames.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                frames.append(item)
+                records += len(item[1]) // self.dtype.itemsize
+            await self._process(frames)
+
+    async def stop(self):
+        """
+        Stops listening; frames already received are still processed before run() returns.
+        """
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        for transport in self._transports:
+            transport.close()
+        await self._frames.put(None)
+
+async def replay_csv(file_path, port, host="127.0.0.1", protocol="tcp", rate_hz=100.0, records_per_packet=1,
+                     channels=None, time_column="timestamp", loops=1):
+    """
+    Plays a telemetry CSV file back to a live service as framed packets.
+
+    Packets are paced against a fixed schedule (sample i is due at i / rate_hz) so the
+    rate does not drift. Over TCP the replayer waits whenever the service pushes back.
+
+    Parameters:
+    file_path (str): Path to the CSV file.
+    port (int): Port of the service.
+    host (str): Address of the service.
+    protocol (str): "tcp" or "udp".
+    rate_hz (float): Samples sent per second (None sends as fast as possible).
+    records_per_packet (int): Samples per frame.
+    channels (list): Channels to send, in packet order (defaults to the numeric columns).
+    time_column (str): Column name for the timestamps.
+    loops (int): Number of times to play the file; each loop is shifted in time after the previous one.
+
+    Returns:
+    int: Number of samples sent.
+    """
+    data = pd.read_csv(file_path, parse_dates=[time_column])
+    if channels is None:
+        channels = [column for column in data.select_dtypes(include=[np.number]).columns if column != time_column]
+    records = encode_records(data, channels, time_column)
+    timestamps = records["timestamp"].copy()
+    span = int(timestamps[-1] - timestamps[0]) + (int(np.median(np.diff(timestamps))) if len(records) > 1 else 0)
+
+    loop = asyncio.get_running_loop()
+    if protocol == "tcp":
+        _, writer = await asyncio.open_connection(host, port)
+        send = writer.write
+    elif protocol == "udp":
+        transport, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol, remote_addr=(host, port))
+        send = transport.sendto
+    else:
+        raise ValueError(f"Unsupported protocol '{protocol}'. Choose 'tcp' or 'udp'.")
+
+    start = loop.time()
+    sent = 0
+    for index in range(loops):
+        records["timestamp"] = timestamps + index * span
+        for offset in range(0, len(records), records_per_packet):
+            if rate_hz:
+                delay = start + sent / rate_hz - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            packet = records[offset:offset + records_per_packet]
+            send(encode_frame(packet))
+            sent += len(packet)
+            if protocol == "tcp":
+                await writer.drain()
+
+    if protocol == "tcp":
+        writer.close()
+        await writer.wait_closed()
+    else:
+        transport.close()
+    rate = f"{rate_hz} samples/s" if rate_hz else "full speed"
+    print(f"Replayed {sent} samples from {file_path} over {protocol.upper()} at {rate}")
+    return sent
+
+def summarize_result(results):
+    """
+    Formats a one-line summary of a published batch result.
+
+    Parameters:
+    results (dict): Result published by LiveTelemetryService.
+
+    Returns:
+    str: The summary.
+    """
+    parts = [f"{len(results['batch'])} samples", f"latency {results['latency_s'] * 1000:.1f} ms"]
+    for key, label in (("z_anomalies", "z-score"), ("threshold_anomalies", "threshold"), ("limit_violations", "limit")):
+        if key in results:
+            parts.append(f"{len(results[key])} {label}")
+    if "energy" in results and len(results["energy"]):
+        parts.append(f"net {results['energy']['cumulative_net_wh'].iloc[-1]:.1f} Wh")
+    return ", ".join(parts)
+
+async def print_results(queue, name="live"):
+    """
+    Subscriber printing a summary per batch and the detected anomalies.
+
+    Parameters:
+    queue (asyncio.Queue): Queue returned by LiveTelemetryService.subscribe.
+    name (str): Label printed with each batch.
+    """
+    while (results := await queue.get()) is not None:
+        print(f"[{name}] {summarize_result(results)}")
+        for key in ("z_anomalies", "threshold_anomalies", "limit_violations"):
+            if key in results and len(results[key]):
+                show(results[key])
+
+async def _demo():
+    from limit_checking import load_limits
+
+    # Power telemetry over TCP: limits, threshold, z-score and energy balance
+    power_channels = ["power_generation_w", "power_consumption_w"]
+    power = LiveTelemetryService(
+        power_channels, z_score_columns=["power_consumption_w"], z_threshold=2.0,
+        thresholds={"power_consumption_w": 130.0}, limits=load_limits("data/sample_limits.csv"),
+        energy_columns=tuple(power_channels), batch_records=8, max_latency_s=0.1)
+    power_port = await power.start_tcp()
+
+    # Housekeeping telemetry over UDP: z-score and threshold checks
+    housekeeping_channels = ["temperature_c", "power_consumption_w", "voltage_v"]
+    housekeeping = LiveTelemetryService(
+        housekeeping_channels, z_score_columns=["temperature_c", "voltage_v"], z_threshold=2.0,
+        thresholds={"temperature_c": 23.0}, batch_records=16, max_latency_s=0.1)
+    housekeeping_port = await housekeeping.start_udp()
+
+    services = {"power": power, "housekeeping": housekeeping}
+    tasks = [asyncio.create_task(print_results(service.subscribe(), name)) for name, service in services.items()]
+    tasks += [asyncio.create_task(service.run()) for service in services.values()]
+
+    # Play both files back concurrently, the power file twice
+    await asyncio.gather(
+        replay_csv("data/sample_power_data.csv", power_port, protocol="tcp", rate_hz=50.0, channels=power_channels,
+                   loops=2),
+        replay_csv("data/sample_data.csv", housekeeping_port, protocol="udp", rate_hz=100.0, records_per_packet=4,
+                   channels=housekeeping_channels),
+    )
+    await asyncio.sleep(0.2)
+    for service in services.values():
+        await service.stop()
+    await asyncio.gather(*tasks)
+    for name, service in services.items():
+        print(f"{name} service statistics: {service.stats}")
+
+if __name__ == "__main__":
+    asyncio.run(_demo())
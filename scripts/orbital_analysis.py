@@ -1,4 +1,5 @@
 import numpy as np
+from instrumentation import instrument
 
 def calculate_orbital_elements(position, velocity, mu=398600.4418):
     """
@@ -72,6 +73,7 @@ def calculate_orbital_elements(position, velocity, mu=398600.4418):
         "true_anomaly": true_anomaly,
     }
 
+@instrument
 def validate_trajectory(predicted_positions, actual_positions):
     """
     Compares predicted trajectories with actual data.
@@ -1,8 +1,8 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+from instrumentation import instrument
 
+@instrument
 def plot_3d_orientation(data, output_file="outputs/orientation_3d.png"):
     """
     Visualizes spacecraft orientation in 3D using roll, pitch, and yaw.
@@ -11,6 +11,9 @@ def plot_3d_orientation(data, output_file="outputs/orientation_3d.png"):
     data (pd.DataFrame): The dataset containing orientation angles.
     output_file (str): Path to save the plot.
     """
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d import Axes3D
+
     fig = plt.figure(figsize=(10, 8))
     ax = fig.add_subplot(111, projection='3d')
 
@@ -0,0 +1,259 @@
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import pandas as pd
+import numpy as np
+from content_hash import new_digest, hash_value, hash_function, hash_file
+from result_cache import write_atomic, evict_lru
+
+def _read_csv(file_path, **read_kwargs):
+    """
+    Loader used by CSV source stages.
+    """
+    return pd.read_csv(file_path, **read_kwargs)
+
+def _copy_input(value):
+    """
+    Copies mutable inputs so a stage cannot modify a cached upstream result.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return value.copy()
+    return value
+
+class Pipeline:
+    """
+    In-memory pipeline of analysis stages with content-hash caching.
+
+    Stages pass DataFrames and arrays to each other in memory instead of through CSV
+    files. Each stage's cache key combines its function, its parameters and the keys
+    of its inputs, so after changing one parameter only that stage and the stages
+    downstream of it are recomputed. Independent stages run concurrently.
+
+    A cached stage is not run at all, so its side effects (CSV files written, messages
+    printed) only happen when it is computed.
+    """
+
+    def __init__(self, cache_dir=None, max_workers=4, max_mb=None):
+        """
+        Parameters:
+        cache_dir (str): Folder to persist stage results across runs (None keeps them in memory only).
+        max_workers (int): Maximum number of stages run concurrently.
+        max_mb (float): Size limit of cache_dir (MB), above which the least recently used
+        results are deleted (defaults to the result cache limit, SPACECRAFT_CACHE_MAX_MB).
+        """
+        self.stages = {}
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.max_bytes = None if max_mb is None else int(max_mb * 2**20)
+        self._memory_cache = {}
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def add_source(self, name, value):
+        """
+        Adds an in-memory DataFrame or array as a source stage.
+
+        Parameters:
+        name (str): Stage name.
+        value: The source data.
+        """
+        self.stages[name] = {"func": None, "inputs": [], "params": {}, "value": value,
+                             "fingerprint": hash_value(value)}
+
+    def add_csv_source(self, name, file_path, **read_kwargs):
+        """
+        Adds a CSV file as a source stage; its key is a hash of the file content, taken
+        each time the pipeline runs, so editing the file invalidates the cached results.
+
+        Parameters:
+        name (str): Stage name.
+        file_path (str): Path to the CSV file.
+        read_kwargs: Keyword arguments passed to pd.read_csv.
+        """
+        self.stages[name] = {"func": _read_csv, "inputs": [], "params": dict(read_kwargs, file_path=file_path),
+                             "fingerprint": "", "file": file_path}
+
+    def add_stage(self, name, func, inputs=(), **params):
+        """
+        Adds a processing stage.
+
+        The stage is called as func(*input_values, **params).
+
+        Parameters:
+        name (str): Stage name.
+        func (callable): Function computing the stage output.
+        inputs (list): Names of the upstream stages whose outputs are passed positionally.
+        params: Keyword parameters passed to func.
+        """
+        for upstream in inputs:
+            if upstream not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{upstream}'.")
+        self.stages[name] = {"func": func, "inputs": list(inputs), "params": params, "fingerprint": ""}
+
+    def _keys(self):
+        """
+        Computes the cache key of every stage from its upstream keys.
+        """
+        keys, visiting = {}, set()
+
+        def key_of(name):
+            if name in keys:
+                return keys[name]
+            if name in visiting:
+                raise ValueError(f"Pipeline has a dependency cycle through stage '{name}'.")
+            visiting.add(name)
+            stage = self.stages[name]
+            digest = new_digest()
+            digest.update(name.encode())
+            digest.update(stage["fingerprint"].encode())
+            if "file" in stage:
+                digest.update(hash_file(stage["file"]).encode())
+            if stage["func"] is not None:
+                digest.update(hash_function(stage["func"]).encode())
+            digest.update(hash_value(stage["params"]).encode())
+            for upstream in stage["inputs"]:
+                digest.update(key_of(upstream).encode())
+            keys[name] = digest.hexdigest()
+            return keys[name]
+
+        for name in self.stages:
+            key_of(name)
+        return keys
+
+    def _cache_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def _load_cached(self, key):
+        """
+        Loads a cached result into memory; returns False if it is not cached (or unreadable).
+        """
+        if key in self._memory_cache:
+            return True
+        if self.cache_dir is None:
+            return False
+        path = self._cache_path(key)
+        try:
+            with open(path, "rb") as f:
+                self._memory_cache[key] = pickle.load(f)
+            os.utime(path)  # Mark as recently used
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False
+        return True
+
+    def _store(self, key, value):
+        self._memory_cache[key] = value
+        if self.cache_dir is not None:
+            write_atomic(self._cache_path(key), lambda f: pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL))
+            evict_lru(self.cache_dir, self.max_bytes, suffix=".pkl")
+
+    def _execute(self, name, input_values):
+        stage = self.stages[name]
+        if stage["func"] is None:
+            return stage["value"]
+        return stage["func"](*[_copy_input(value) for value in input_values], **stage["params"])
+
+    def run(self, targets=None):
+        """
+        Runs the pipeline, recomputing only stages whose key is not cached.
+
+        Parameters:
+        targets (list): Stages whose outputs are wanted (defaults to all stages).
+
+        Returns:
+        dict: Stage name -> output for each target.
+        """
+        keys = self._keys()
+        targets = list(self.stages) if targets is None else list(targets)
+
+        # Walk upstream from the targets, stopping at stages that are already cached. Cached
+        # results are loaded now, so evictions during the run cannot remove them.
+        pending, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name in pending or self._load_cached(keys[name]):
+                continue
+            pending.add(name)
+            stack.extend(self.stages[name]["inputs"])
+
+        print(f"\nPipeline: {len(pending)} stage(s) to compute, "
+              f"{len(set(targets) - pending)} target(s) served from cache")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+            while pending or running:
+                ready = [name for name in pending
+                         if not any(upstream in pending or upstream in running.values()
+                                    for upstream in self.stages[name]["inputs"])]
+                for name in ready:
+                    pending.discard(name)
+                    inputs = [self._memory_cache[keys[upstream]] for upstream in self.stages[name]["inputs"]]
+                    running[executor.submit(self._execute, name, inputs)] = name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    self._store(keys[name], future.result())
+                    print(f"Stage '{name}' computed")
+
+        return {name: self._memory_cache[keys[name]] for name in targets}
+
+def _filter_column(data, column, kind, fs, cutoff=None, lowcut=None, highcut=None, order=4):
+    """
+    Applies one of the data_filtering Butterworth filters to a DataFrame column.
+    """
+    from data_filtering import butter_lowpass_filter, butter_highpass_filter, butter_bandpass_filter
+    signal = data[column].values
+    if kind == "low":
+        return butter_lowpass_filter(signal, cutoff, fs, order)
+    if kind == "high":
+        return butter_highpass_filter(signal, cutoff, fs, order)
+    return butter_bandpass_filter(signal, lowcut, highcut, fs, order)
+
+def _numeric_statistics(data):
+    """
+    Descriptive statistics of the numerical columns, as in statistical_analysis.
+    """
+    from statistical_analysis import calculate_descriptive_statistics
+    return calculate_descriptive_statistics(data.select_dtypes(include=[np.number]))
+
+def build_default_pipeline(file_path="data/sample_data.csv", column="temperature_c", cache_dir=None, max_workers=4):
+    """
+    Declares the scripts' file-based workflow as an in-memory pipeline.
+
+    ingestion -> cleaning -> interpolation -> anomaly detection (threshold, Z-score,
+    Isolation Forest), plus filtering and statistics on the cleaned data.
+
+    Parameters:
+    file_path (str): Path to the raw telemetry CSV file.
+    column (str): Channel analysed by the filtering and anomaly stages.
+    cache_dir (str): Folder to persist stage results across runs.
+    max_workers (int): Maximum number of stages run concurrently.
+
+    Returns:
+    Pipeline: The declared pipeline.
+    """
+    from data_ingestion import clean_data
+    from data_transformation import interpolate_missing_data
+    from anomaly_detection import threshold_based_detection, z_score_detection, isolation_forest_detection
+
+    pipeline = Pipeline(cache_dir=cache_dir, max_workers=max_workers)
+    pipeline.add_csv_source("raw", file_path, parse_dates=["timestamp"])
+    pipeline.add_stage("cleaned", clean_data, inputs=["raw"])
+    pipeline.add_stage("interpolated", interpolate_missing_data, inputs=["cleaned"], column=column)
+    pipeline.add_stage("threshold_anomalies", threshold_based_detection, inputs=["interpolated"],
+                       column=column, threshold=23.0)
+    pipeline.add_stage("z_scores", z_score_detection, inputs=["interpolated"], column=column, threshold=2.5)
+    pipeline.add_stage("isolation_forest", isolation_forest_detection, inputs=["interpolated"],
+                       column=column, contamination=0.1)
+    pipeline.add_stage("low_pass", _filter_column, inputs=["cleaned"], column=column, kind="low", fs=1, cutoff=0.1)
+    pipeline.add_stage("statistics", _numeric_statistics, inputs=["cleaned"])
+    return pipeline
+
+if __name__ == "__main__":
+    # First run computes every stage
+    pipeline = build_default_pipeline(cache_dir="outputs/pipeline_cache")
+    results = pipeline.run()
+
+    # Changing one parameter recomputes only that stage
+    from anomaly_detection import z_score_detection
+    pipeline.add_stage("z_scores", z_score_detection, inputs=["interpolated"], column="temperature_c", threshold=2.0)
+    results = pipeline.run()
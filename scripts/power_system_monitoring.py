@@ -1,8 +1,10 @@
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 import os 
+from instrumentation import instrument, show
+from data_transformation import to_seconds
 
+@instrument
 def calculate_energy_balance(data, generation_col, consumption_col):
     """
     Calculates the energy balance (generation - consumption) at each time step.
@@ -18,6 +20,176 @@ def calculate_energy_balance(data, generation_col, consumption_col):
     data["energy_balance"] = data[generation_col] - data[consumption_col]
     return data["energy_balance"]
 
+def _bounded_cumsum(deltas, start, lower, upper, block_size=8192):
+    """
+    Cumulative sum of deltas starting at start, clamped to [lower, upper] after every step.
+
+    Each step is the map x -> clip(x + d, lo, hi). Maps of this form are closed under
+    composition, so the prefixes of each block are built with a log2(block_size)-step
+    doubling scan instead of a Python loop over samples; blocks keep the work cache-sized.
+    """
+    deltas = np.asarray(deltas, dtype=float)
+    result = np.empty_like(deltas)
+    for offset in range(0, deltas.size, block_size):
+        a = deltas[offset:offset + block_size].copy()
+        lo = np.full(a.shape, lower, dtype=float)
+        hi = np.full(a.shape, upper, dtype=float)
+        step = 1
+        while step < a.size:
+            a2, lo2, hi2 = a[step:], lo[step:], hi[step:]
+            new_lo = np.clip(lo[:-step] + a2, lo2, hi2)
+            new_hi = np.clip(hi[:-step] + a2, lo2, hi2)
+            a[step:] = a[:-step] + a2
+            lo[step:] = new_lo
+            hi[step:] = new_hi
+            step *= 2
+        result[offset:offset + a.size] = np.clip(start + a, lo, hi)
+        start = result[offset + a.size - 1]
+    return result
+
+@instrument
+def integrate_energy(data, generation_col, consumption_col, time_column="timestamp", state=None):
+    """
+    Integrates power generation, consumption and balance over (possibly irregular) timestamps.
+
+    Uses the trapezoidal rule between consecutive samples. Pass the returned state to the
+    next call to process a long record in chunks; the interval bridging two chunks is
+    then integrated as well.
+
+    Parameters:
+    data (pd.DataFrame): The dataset.
+    generation_col (str): Column name for power generation (W).
+    consumption_col (str): Column name for power consumption (W).
+    time_column (str): Column name for time (datetimes or seconds).
+    state (dict): State returned by the previous chunk, or None for the first chunk.
+
+    Returns:
+    tuple: (pd.DataFrame, dict) with per-sample generated_wh, consumed_wh and net_wh for the
+    interval ending at each sample plus cumulative_net_wh, and the state for the next chunk.
+    """
+    state = dict(state or {})
+    t = to_seconds(data[time_column].values)
+    gen = data[generation_col].to_numpy(dtype=float)
+    cons = data[consumption_col].to_numpy(dtype=float)
+
+    # Prepend the last sample of the previous chunk so the bridging interval is counted
+    if "time_s" in state:
+        t = np.concatenate([[state["time_s"]], t])
+        gen = np.concatenate([[state["generation_w"]], gen])
+        cons = np.concatenate([[state["consumption_w"]], cons])
+        hours = np.diff(t) / 3600.0
+    else:
+        # No interval before the first sample (slicing keeps an empty chunk empty)
+        hours = np.diff(t, prepend=t[:1]) / 3600.0
+        gen = np.concatenate([gen[:1], gen])
+        cons = np.concatenate([cons[:1], cons])
+
+    generated_wh = 0.5 * (gen[1:] + gen[:-1]) * hours
+    consumed_wh = 0.5 * (cons[1:] + cons[:-1]) * hours
+    net_wh = generated_wh - consumed_wh
+    cumulative_net_wh = state.get("cumulative_net_wh", 0.0) + np.cumsum(net_wh)
+
+    energy = pd.DataFrame({
+        time_column: data[time_column].values,
+        "energy_balance_w": gen[1:] - cons[1:],
+        "generated_wh": generated_wh,
+        "consumed_wh": consumed_wh,
+        "net_wh": net_wh,
+        "cumulative_net_wh": cumulative_net_wh,
+    })
+    if len(energy):
+        state.update({
+            "time_s": t[-1],
+            "generation_w": gen[-1],
+            "consumption_w": cons[-1],
+            "cumulative_net_wh": cumulative_net_wh[-1],
+        })
+    return energy, state
+
+@instrument
+def simulate_battery_soc(data, generation_col, consumption_col, capacity_wh, initial_soc=1.0,
+                         charge_efficiency=0.95, discharge_efficiency=0.95, min_soc=0.0,
+                         time_column="timestamp", state=None):
+    """
+    Simulates battery state of charge from the integrated energy balance.
+
+    Surplus energy is stored at charge_efficiency and deficits draw net_wh / discharge_efficiency
+    from the battery. The stored energy is clamped to [min_soc * capacity_wh, capacity_wh];
+    the energy that could not be stored (battery full) or supplied (battery empty) is reported.
+
+    Parameters:
+    data (pd.DataFrame): The dataset.
+    generation_col (str): Column name for power generation (W).
+    consumption_col (str): Column name for power consumption (W).
+    capacity_wh (float): Battery capacity (Wh).
+    initial_soc (float): State of charge (0-1) at the first sample; ignored when state is given.
+    charge_efficiency (float): Fraction of surplus energy that is stored.
+    discharge_efficiency (float): Fraction of drawn energy delivered to the load.
+    min_soc (float): Lowest allowed state of charge (0-1).
+    time_column (str): Column name for time (datetimes or seconds).
+    state (dict): State returned by the previous chunk, or None for the first chunk.
+
+    Returns:
+    tuple: (pd.DataFrame, dict) with the integrate_energy columns plus soc_wh, soc,
+    curtailed_wh and unmet_wh, and the state for the next chunk.
+    """
+    energy, new_state = integrate_energy(data, generation_col, consumption_col, time_column, state)
+    start_wh = (state or {}).get("soc_wh", initial_soc * capacity_wh)
+    lower_wh = min_soc * capacity_wh
+
+    net_wh = energy["net_wh"].to_numpy()
+    battery_delta = np.where(net_wh > 0, net_wh * charge_efficiency, net_wh / discharge_efficiency)
+    soc_wh = _bounded_cumsum(battery_delta, start_wh, lower_wh, capacity_wh)
+
+    # Whatever the clamp removed was either curtailed (full) or left unserved (empty)
+    clipped = battery_delta - np.diff(soc_wh, prepend=start_wh)
+    energy["soc_wh"] = soc_wh
+    energy["soc"] = soc_wh / capacity_wh
+    energy["curtailed_wh"] = np.where((soc_wh == capacity_wh) & (clipped > 0), clipped / charge_efficiency, 0.0)
+    energy["unmet_wh"] = np.where((soc_wh == lower_wh) & (clipped < 0), -clipped * discharge_efficiency, 0.0)
+
+    if len(energy):
+        new_state["soc_wh"] = soc_wh[-1]
+    return energy, new_state
+
+@instrument
+def summarize_orbits(results, orbit_period_s, epoch=None, time_column="timestamp"):
+    """
+    Summarizes a battery simulation per orbit.
+
+    Parameters:
+    results (pd.DataFrame): Output of simulate_battery_soc.
+    orbit_period_s (float): Orbital period (s).
+    epoch (float or datetime): Start of orbit 0; defaults to the first sample.
+    time_column (str): Column name for time.
+
+    Returns:
+    pd.DataFrame: Per-orbit generated/consumed/net energy (Wh), min/max state of charge,
+    depth of discharge, curtailed and unmet energy.
+    """
+    t = to_seconds(results[time_column].values)
+    if epoch is None:
+        start_s = t[0]
+    else:
+        start_s = to_seconds(np.array([epoch], dtype=results[time_column].values.dtype))[0]
+    orbit = np.floor((t - start_s) / orbit_period_s).astype(np.int64)
+
+    summary = results.groupby(orbit).agg(
+        start=(time_column, "first"),
+        end=(time_column, "last"),
+        generated_wh=("generated_wh", "sum"),
+        consumed_wh=("consumed_wh", "sum"),
+        net_wh=("net_wh", "sum"),
+        min_soc=("soc", "min"),
+        max_soc=("soc", "max"),
+        curtailed_wh=("curtailed_wh", "sum"),
+        unmet_wh=("unmet_wh", "sum"),
+    )
+    summary["depth_of_discharge"] = 1.0 - summary["min_soc"]
+    summary.index.name = "orbit"
+    return summary.reset_index()
+
+@instrument
 def detect_performance_deviations(data, column, lower_bound, upper_bound):
     """
     Detects deviations in performance based on predefined bounds.
@@ -32,10 +204,11 @@ def detect_performance_deviations(data, column, lower_bound, upper_bound):
     pd.DataFrame: Data points that are outside the expected range.
     """
     deviations = data[(data[column] < lower_bound) | (data[column] > upper_bound)]
-    print(f"\nDetected Deviations in {column}:")
-    print(deviations)
+    show(f"\nDetected Deviations in {column}:")
+    show(deviations)
     return deviations
 
+@instrument
 def plot_power_trends(data, generation_col, consumption_col, output_file="outputs/power_trends.png"):
     """
     Plots power generation and consumption trends over time.
@@ -46,6 +219,8 @@ def plot_power_trends(data, generation_col, consumption_col, output_file="output
     consumption_col (str): Column name for power consumption.
     output_file (str): Path to save the plot.
     """
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(10, 6))
     plt.plot(data["timestamp"], data[generation_col], label="Power Generation", color="green")
     plt.plot(data["timestamp"], data[consumption_col], label="Power Consumption", color="red")
@@ -58,6 +233,7 @@ def plot_power_trends(data, generation_col, consumption_col, output_file="output
     print(f"Power trends plot saved to {output_file}")
     plt.show()
 
+@instrument
 def plot_energy_balance(data, output_file="outputs/energy_balance.png"):
     """
     Plots the energy balance over time.
@@ -66,6 +242,8 @@ def plot_energy_balance(data, output_file="outputs/energy_balance.png"):
     data (pd.DataFrame): The dataset.
     output_file (str): Path to save the plot.
     """
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(10, 6))
     plt.plot(data["timestamp"], data["energy_balance"], label="Energy Balance", color="blue")
     plt.axhline(0, color="black", linestyle="--", linewidth=1, label="Balance = 0")
@@ -94,6 +272,19 @@ if __name__ == "__main__":
     plot_power_trends(data, generation_col="power_generation_w", consumption_col="power_consumption_w")
     plot_energy_balance(data)
 
+    # Integrate energy and simulate battery state of charge
+    battery, state = simulate_battery_soc(data, "power_generation_w", "power_consumption_w", capacity_wh=200.0)
+    orbit_summary = summarize_orbits(battery, orbit_period_s=5400)
+    show("\nBattery State of Charge:", battery[["timestamp", "net_wh", "soc"]], sep="\n")
+    show("\nPer-Orbit Summary:", orbit_summary, sep="\n")
+
+    # The same simulation, run chunk by chunk with carried state (for long archives)
+    state = None
+    for chunk in pd.read_csv(file_path, parse_dates=["timestamp"], chunksize=4):
+        chunk_results, state = simulate_battery_soc(chunk, "power_generation_w", "power_consumption_w",
+                                                    capacity_wh=200.0, state=state)
+    print(f"Final state of charge (chunked): {state['soc_wh'] / 200.0:.3f}")
+
     # Save results
     deviations_folder = "outputs/deviations"
     os.makedirs(deviations_folder, exist_ok=True)
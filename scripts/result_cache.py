@@ -0,0 +1,209 @@
+import functools
+import os
+import tempfile
+import numpy as np
+from content_hash import hash_value
+
+# Settings can also be given through the environment:
+#   SPACECRAFT_CACHE_DIR=outputs/result_cache    folder holding the cached results
+#   SPACECRAFT_CACHE_MAX_MB=1024                 size above which the least recently used results are evicted
+#   SPACECRAFT_CACHE=0                           disable the cache
+_settings = {
+    "cache_dir": os.environ.get("SPACECRAFT_CACHE_DIR", "outputs/result_cache"),
+    "max_bytes": int(float(os.environ.get("SPACECRAFT_CACHE_MAX_MB", 1024)) * 2**20),
+    "enabled": os.environ.get("SPACECRAFT_CACHE", "1") not in ("", "0"),
+}
+_stats = {"hits": 0, "misses": 0}
+
+def configure(cache_dir=None, max_mb=None, enabled=None):
+    """
+    Changes the cache settings; arguments left as None are unchanged.
+
+    Parameters:
+    cache_dir (str): Folder holding the cached results.
+    max_mb (float): Cache size limit (MB).
+    enabled (bool): Use the cache.
+    """
+    if cache_dir is not None:
+        _settings["cache_dir"] = cache_dir
+    if max_mb is not None:
+        _settings["max_bytes"] = int(max_mb * 2**20)
+    if enabled is not None:
+        _settings["enabled"] = enabled
+
+def _entry_path(key):
+    return os.path.join(_settings["cache_dir"], f"{key}.npz")
+
+def _load(key):
+    """
+    Returns the arrays stored under key, or None. A hit marks the entry as recently used.
+    """
+    path = _entry_path(key)
+    try:
+        with np.load(path, allow_pickle=False) as entry:
+            arrays = [entry[f"a{i}"] for i in range(len(entry.files) - 1)]
+            single = bool(entry["single"])
+        os.utime(path)
+    except (FileNotFoundError, ValueError, OSError, KeyError):
+        # Missing, evicted meanwhile by another process, or unreadable
+        _stats["misses"] += 1
+        return None
+    _stats["hits"] += 1
+    return arrays[0] if single else tuple(arrays)
+
+def write_atomic(file_path, write):
+    """
+    Writes a file through a temporary file renamed into place, so readers (in any
+    process) see either the previous file or the complete new one, never a partial one.
+
+    Parameters:
+    file_path (str): Path of the file.
+    write (callable): Function writing the content to the binary file object it is given.
+    """
+    directory = os.path.dirname(file_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as f:
+            write(f)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def evict_lru(cache_dir, max_bytes=None, suffix=".npz"):
+    """
+    Deletes the least recently used files of a cache folder until it fits in its size limit.
+
+    Files are ordered by modification time, which readers bump on every hit.
+
+    Parameters:
+    cache_dir (str): Cache folder.
+    max_bytes (int): Size limit (defaults to the result cache limit, SPACECRAFT_CACHE_MAX_MB).
+    suffix (str): Extension of the cache entries.
+    """
+    max_bytes = _settings["max_bytes"] if max_bytes is None else max_bytes
+    entries = []
+    with os.scandir(cache_dir) as scan:
+        for entry in scan:
+            if entry.name.endswith(suffix):
+                try:
+                    info = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # Another process evicted it first
+        total -= size
+
+def _store(key, value):
+    """
+    Stores an array or a tuple of arrays under key, then evicts old entries if the cache is too large.
+    """
+    single = not isinstance(value, tuple)
+    arrays = [value] if single else list(value)
+    write_atomic(_entry_path(key), lambda f: np.savez(
+        f, single=single, **{f"a{i}": np.asarray(array) for i, array in enumerate(arrays)}))
+    evict_lru(_settings["cache_dir"])
+
+def memoize(func):
+    """
+    Decorator caching a function's results on disk, keyed by its code and arguments.
+
+    The function must be deterministic and return a NumPy array or a tuple of arrays,
+    which are stored as uncompressed .npz files in the cache folder.
+
+    Parameters:
+    func (callable): Function to cache.
+
+    Returns:
+    callable: The caching function.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _settings["enabled"]:
+            return func(*args, **kwargs)
+        key = hash_value(func, args, sorted(kwargs.items()))
+        value = _load(key)
+        if value is None:
+            value = func(*args, **kwargs)
+            _store(key, value)
+        return value
+
+    return wrapper
+
+# Matplotlib backends on which plt.show() displays nothing
+_NON_INTERACTIVE_BACKENDS = {"agg", "cairo", "pdf", "pgf", "ps", "svg", "template"}
+
+def _displays_figures():
+    """
+    Returns True when the active Matplotlib backend shows figures (windows or notebook output).
+    """
+    import matplotlib
+
+    return matplotlib.get_backend().lower() not in _NON_INTERACTIVE_BACKENDS
+
+def cached_output_file(output_file, render, *key_values, shows_figure=False):
+    """
+    Produces an output file (typically a plot) with render(), or copies it from the cache.
+
+    The file is cached under the hash of key_values and the file extension, so the
+    key_values must determine the file's content. A cache hit copies the saved file
+    instead of redrawing it. When render() also displays the figure (shows_figure=True),
+    the cache is only used with a non-interactive Matplotlib backend (e.g. Agg, as in
+    batch runs), where plt.show() displays nothing; with an interactive backend the
+    figure is always drawn and shown.
+
+    Parameters:
+    output_file (str): Path of the file render() writes.
+    render (callable): Function writing output_file.
+    key_values: Values the file content depends on.
+    shows_figure (bool): render() calls plt.show().
+
+    Returns:
+    bool: True if the file came from the cache.
+    """
+    if not _settings["enabled"] or (shows_figure and _displays_figures()):
+        render()
+        return False
+    key = hash_value("file", os.path.splitext(output_file)[1], *key_values)
+    content = _load(key)
+    if content is not None:
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        with open(output_file, "wb") as f:
+            f.write(content.tobytes())
+        return True
+    render()
+    with open(output_file, "rb") as f:
+        _store(key, np.frombuffer(f.read(), dtype=np.uint8))
+    return False
+
+def cache_info():
+    """
+    Returns:
+    dict: Cache folder, entries, size (MB), limit (MB) and this process's hits and misses.
+    """
+    sizes = []
+    if os.path.isdir(_settings["cache_dir"]):
+        with os.scandir(_settings["cache_dir"]) as scan:
+            sizes = [entry.stat().st_size for entry in scan if entry.name.endswith(".npz")]
+    return {"cache_dir": _settings["cache_dir"], "entries": len(sizes), "size_mb": sum(sizes) / 2**20,
+            "max_mb": _settings["max_bytes"] / 2**20, **_stats}
+
+def clear_cache():
+    """
+    Deletes every cached result.
+    """
+    if os.path.isdir(_settings["cache_dir"]):
+        with os.scandir(_settings["cache_dir"]) as scan:
+            for entry in scan:
+                if entry.name.endswith((".npz", ".tmp")):
+                    os.remove(entry.path)
+    print(f"Result cache {_settings['cache_dir']} cleared")
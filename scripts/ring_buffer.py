@@ -0,0 +1,287 @@
+import threading
+import pandas as pd
+import numpy as np
+
+class RingWindow:
+    """
+    Zero-copy view of a time window of a TelemetryRingBuffer.
+
+    The window is made of at most two segments (two when it wraps around the end of the
+    buffer), each a (timestamps, values) pair of views into the buffer's arrays; values
+    has one row per channel. The views are only meaningful until the writer overwrites
+    that part of the buffer: check is_valid() after using them, or use to_frame() /
+    TelemetryRingBuffer.snapshot() for a stable copy.
+    """
+
+    def __init__(self, buffer, first, last):
+        """
+        Parameters:
+        buffer (TelemetryRingBuffer): The buffer.
+        first (int): Absolute index of the first sample in the window.
+        last (int): Absolute index one past the last sample in the window.
+        """
+        self.buffer = buffer
+        self.first = first
+        self.last = last
+        self.segments = buffer._segments(first, last)
+
+    def __len__(self):
+        return self.last - self.first
+
+    def timestamps(self):
+        """
+        Returns:
+        list: datetime64[ns] views, one per segment.
+        """
+        return [timestamps for timestamps, _ in self.segments]
+
+    def channel(self, name):
+        """
+        Parameters:
+        name (str): Channel name.
+
+        Returns:
+        list: Contiguous value views of the channel, one per segment.
+        """
+        row = self.buffer._channel_index[name]
+        return [values[row] for _, values in self.segments]
+
+    def is_valid(self):
+        """
+        Returns True if no sample of the window has been (or is being) overwritten.
+        """
+        return self.first >= self.buffer._reserved - self.buffer.capacity
+
+    def to_arrays(self):
+        """
+        Copies the window into contiguous arrays.
+
+        Returns:
+        tuple: (timestamps, values) with values shaped (channels, samples).
+        """
+        if not self.segments:
+            return np.empty(0, dtype="datetime64[ns]"), np.empty((len(self.buffer.channels), 0),
+                                                                  dtype=self.buffer.values.dtype)
+        timestamps = np.concatenate([timestamps for timestamps, _ in self.segments])
+        values = np.concatenate([values for _, values in self.segments], axis=1)
+        return timestamps, values
+
+    def to_frame(self):
+        """
+        Copies the window into a DataFrame.
+
+        Returns:
+        pd.DataFrame: timestamp column followed by one column per channel.
+        """
+        timestamps, values = self.to_arrays()
+        data = pd.DataFrame(dict(zip(self.buffer.channels, values)))
+        data.insert(0, "timestamp", timestamps)
+        return data
+
+class TelemetryRingBuffer:
+    """
+    Preallocated, fixed-capacity ring buffer holding the latest samples of many channels.
+
+    Timestamps are one datetime64[ns] array and the values one (channels, capacity) array,
+    so every channel is a contiguous row. Appends copy each batch into place with at most
+    two slice assignments and never allocate. Windows are views (see RingWindow) located by
+    binary search, since timestamps must be appended in non-decreasing order.
+
+    One writer thread and any number of reader threads may use the buffer without locks.
+    The writer publishes the range it is about to overwrite before writing and the new
+    sample count after, so a reader can tell whether its window was overwritten while it
+    was reading it (RingWindow.is_valid), and snapshot() retries until it gets a clean copy.
+    """
+
+    def __init__(self, channels, capacity, dtype=np.float64):
+        """
+        Parameters:
+        channels (list): Channel names.
+        capacity (int): Number of samples kept.
+        dtype: Float dtype of the values.
+        """
+        self.channels = list(channels)
+        self.capacity = int(capacity)
+        self._channel_index = {channel: row for row, channel in enumerate(self.channels)}
+        self.timestamps = np.zeros(self.capacity, dtype="datetime64[ns]")
+        self.values = np.full((len(self.channels), self.capacity), np.nan, dtype=dtype)
+        self._count = 0      # samples committed since creation
+        self._reserved = 0   # samples committed or being written
+        self._writer_lock = threading.Lock()
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def append(self, timestamps, values):
+        """
+        Appends a batch of samples.
+
+        Parameters:
+        timestamps (array-like): Sample times, non-decreasing and not before the last appended sample.
+        values (dict or np.ndarray): Channel -> values, or an array shaped (channels, samples).
+        """
+        timestamps = np.asarray(timestamps, dtype="datetime64[ns]")
+        if isinstance(values, dict):
+            values = np.stack([np.asarray(values[channel], dtype=self.values.dtype) for channel in self.channels])
+        n = timestamps.size
+        if n == 0:
+            return
+        if values.shape != (len(self.channels), n):
+            raise ValueError(f"Expected values shaped ({len(self.channels)}, {n}), got {values.shape}.")
+        if np.any(timestamps[1:] < timestamps[:-1]):
+            raise ValueError("Timestamps must be non-decreasing.")
+
+        with self._writer_lock:
+            count = self._count
+            if count and timestamps[0] < self.timestamps[(count - 1) % self.capacity]:
+                raise ValueError("Timestamps must not go back in time across appends.")
+            # Only the last capacity samples of an oversized batch can be kept
+            skip = max(0, n - self.capacity)
+            timestamps, values = timestamps[skip:], values[:, skip:]
+            self._reserved = count + n
+            position = (count + skip) % self.capacity
+            head = min(timestamps.size, self.capacity - position)
+            self.timestamps[position:position + head] = timestamps[:head]
+            self.values[:, position:position + head] = values[:, :head]
+            if head < timestamps.size:
+                self.timestamps[:timestamps.size - head] = timestamps[head:]
+                self.values[:, :timestamps.size - head] = values[:, head:]
+            self._count = count + n
+
+    def append_frame(self, data, time_column="timestamp"):
+        """
+        Appends the rows of a DataFrame; channels missing from it are stored as NaN.
+
+        Parameters:
+        data (pd.DataFrame): The samples.
+        time_column (str): Column name for the timestamps.
+        """
+        values = np.full((len(self.channels), len(data)), np.nan, dtype=self.values.dtype)
+        for row, channel in enumerate(self.channels):
+            if channel in data.columns:
+                values[row] = data[channel].to_numpy(dtype=self.values.dtype)
+        self.append(pd.to_datetime(data[time_column]).to_numpy(dtype="datetime64[ns]"), values)
+
+    def _segments(self, first, last):
+        """
+        Returns the (timestamps, values) views covering absolute indices [first, last).
+        """
+        if last <= first:
+            return []
+        start, stop = first % self.capacity, last % self.capacity or self.capacity
+        if start < stop:
+            return [(self.timestamps[start:stop], self.values[:, start:stop])]
+        return [(self.timestamps[start:], self.values[:, start:]),
+                (self.timestamps[:stop], self.values[:, :stop])]
+
+    def _search(self, first, last, value, side):
+        """
+        Absolute index where value would be inserted among the samples [first, last).
+        """
+        offset = first
+        for timestamps, _ in self._segments(first, last):
+            index = np.searchsorted(timestamps, value, side=side)
+            if index < timestamps.size:
+                return offset + index
+            offset += timestamps.size
+        return offset
+
+    def latest(self, n=None, seconds=None):
+        """
+        Returns a zero-copy window of the latest samples.
+
+        Parameters:
+        n (int): Number of samples (defaults to everything held).
+        seconds (float): Alternatively, the time span back from the latest sample (s).
+
+        Returns:
+        RingWindow: The window.
+        """
+        last = self._count
+        first = max(0, last - self.capacity)
+        if seconds is not None and last > first:
+            end = self.timestamps[(last - 1) % self.capacity]
+            first = self._search(first, last, end - np.timedelta64(int(seconds * 1e9), "ns"), "left")
+        elif n is not None:
+            first = max(first, last - int(n))
+        return RingWindow(self, first, last)
+
+    def between(self, start, end):
+        """
+        Returns a zero-copy window of the samples with start <= timestamp <= end.
+
+        Parameters:
+        start: Start time (anything accepted by pd.Timestamp).
+        end: End time (inclusive).
+
+        Returns:
+        RingWindow: The window.
+        """
+        last = self._count
+        first = max(0, last - self.capacity)
+        start = pd.Timestamp(start).to_datetime64().astype("datetime64[ns]")
+        end = pd.Timestamp(end).to_datetime64().astype("datetime64[ns]")
+        return RingWindow(self, self._search(first, last, start, "left"), self._search(first, last, end, "right"))
+
+    def snapshot(self, n=None, seconds=None, retries=10):
+        """
+        Copies the latest samples into a DataFrame, retrying if the writer overwrote them meanwhile.
+
+        Parameters:
+        n (int): Number of samples.
+        seconds (float): Alternatively, the time span back from the latest sample (s).
+        retries (int): Attempts before giving up.
+
+        Returns:
+        pd.DataFrame: timestamp column followed by one column per channel.
+        """
+        for _ in range(retries):
+            window = self.latest(n, seconds)
+            data = window.to_frame()
+            if window.is_valid():
+                return data
+        raise RuntimeError("Ring buffer is being overwritten faster than it can be copied; use a larger capacity.")
+
+if __name__ == "__main__":
+    from synthetic_telemetry import iter_telemetry_chunks
+
+    # Keep the last 10 minutes of 1 Hz housekeeping telemetry
+    channels = ["temperature_c", "power_consumption_w", "voltage_v"]
+    buffer = TelemetryRingBuffer(channels, capacity=600)
+
+    data = pd.read_csv("data/sample_data.csv", parse_dates=["timestamp"])
+    buffer.append_frame(data)
+    print(f"Buffer holds {len(buffer)} samples")
+    print(buffer.between("2024-11-01 05:00:00", "2024-11-01 08:00:00").to_frame())
+
+    # One writer appending batches while readers filter the latest window
+    buffer = TelemetryRingBuffer(channels, capacity=600)
+    stop = threading.Event()
+    reads = {"windows": 0, "overwritten": 0}
+
+    def writer():
+        for chunk in iter_telemetry_chunks("housekeeping", 100000, chunk_size=50):
+            buffer.append_frame(chunk)
+        stop.set()
+
+    def reader():
+        # Poll at about 1 kHz
+        while not stop.wait(0.001):
+            window = buffer.latest(seconds=300)
+            if len(window) < 100:
+                continue
+            # Statistics are combined over the (at most two) segments, without concatenating them
+            segments = window.channel("temperature_c")
+            mean = sum(values.sum() for values in segments) / len(window)
+            peak = max(values.max() for values in segments)
+            reads["windows"] += 1
+            reads["overwritten"] += not window.is_valid()
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"\n{buffer._count} samples written, {reads['windows']} windows read "
+          f"({reads['overwritten']} overwritten while in use)")
+    print(buffer.snapshot(seconds=10))
@@ -0,0 +1,514 @@
+import argparse
+import sys
+
+# Analysis modules (and pandas, scipy, sklearn, matplotlib...) are imported inside the
+# command handlers, so a command only pays for the libraries it actually uses.
+
+# Exit status of the limits subcommand when any sample breaches a red limit. It must differ
+# from 2, which argparse uses for command-line errors, so scripts can tell the two apart.
+RED_LIMIT_EXIT_CODE = 3
+
+def _load_csv(file_path, parse_dates=True):
+    """
+    Loads a telemetry CSV file, parsing the timestamp column when present.
+    """
+    import pandas as pd
+
+    data = pd.read_csv(file_path)
+    if parse_dates and "timestamp" in data.columns:
+        data["timestamp"] = pd.to_datetime(data["timestamp"])
+    return data
+
+def cmd_ingest(args):
+    from data_ingestion import read_and_describe, clean_data
+
+    data = read_and_describe(args.file)
+    if data is None:
+        return 1
+    clean_data(data).to_csv(args.output, index=False)
+    print(f"Cleaned data saved to {args.output}")
+    return 0
+
+def cmd_threshold(args):
+    from anomaly_detection import threshold_based_detection
+
+    threshold_based_detection(_load_csv(args.file), args.column, args.threshold, output_file=args.output)
+    return 0
+
+def cmd_zscore(args):
+    from anomaly_detection import z_score_detection
+
+    z_score_detection(_load_csv(args.file), args.column, args.threshold, output_file=args.output)
+    return 0
+
+def cmd_isolation_forest(args):
+    from anomaly_detection import isolation_forest_detection
+
+    isolation_forest_detection(_load_csv(args.file), args.column, args.contamination, output_file=args.output)
+    return 0
+
+def cmd_discords(args):
+    from anomaly_detection import matrix_profile_discord_detection
+
+    matrix_profile_discord_detection(_load_csv(args.file), args.columns, args.window, top_k=args.top_k,
+                                     max_workers=args.workers, output_file=args.output)
+    return 0
+
+def cmd_limits(args):
+    from limit_checking import load_limits, check_limits
+
+    violations = check_limits(_load_csv(args.file), load_limits(args.limits), mode_column=args.mode_column,
+                              output_file=args.output)
+    return RED_LIMIT_EXIT_CODE if (violations["severity"] == "red").any() else 0
+
+def cmd_thermal_events(args):
+    from thermal_analysis import detect_exceedance_events
+
+    detect_exceedance_events(_load_csv(args.file), {column: args.limit for column in args.columns},
+                             hysteresis=args.hysteresis, min_duration=args.min_duration,
+                             time_column=args.time_column, output_file=args.output)
+    return 0
+
+def cmd_heat_fit(args):
+    from thermal_analysis import fit_heat_dissipation
+
+    data = _load_csv(args.file)
+    fit_heat_dissipation(data[[args.time_column, args.column]].dropna(), args.time_column, args.column,
+                         output_file=args.output)
+    return 0
+
+def cmd_battery(args):
+    from instrumentation import show
+    from power_system_monitoring import simulate_battery_soc, summarize_orbits
+
+    results, _ = simulate_battery_soc(_load_csv(args.file), args.generation_column, args.consumption_column,
+                                      capacity_wh=args.capacity_wh, initial_soc=args.initial_soc,
+                                      charge_efficiency=args.charge_efficiency,
+                                      discharge_efficiency=args.discharge_efficiency, min_soc=args.min_soc)
+    summary = summarize_orbits(results, args.orbit_period_s)
+    show(summary)
+    summary.to_csv(args.output, index=False)
+    print(f"Per-orbit battery summary saved to {args.output}")
+    return 0
+
+def cmd_power(args):
+    from power_system_monitoring import calculate_energy_balance, plot_power_trends, plot_energy_balance
+
+    data = _load_csv(args.file)
+    calculate_energy_balance(data, args.generation_column, args.consumption_column)
+    plot_power_trends(data, args.generation_column, args.consumption_column)
+    plot_energy_balance(data)
+    return 0
+
+def cmd_filter(args):
+    from data_filtering import (butter_lowpass_filter, butter_highpass_filter, butter_bandpass_filter,
+                                plot_filtered_data)
+
+    signal = _load_csv(args.file)[args.column].values
+    if args.kind == "low":
+        filtered = butter_lowpass_filter(signal, args.cutoff, args.fs, args.order)
+    elif args.kind == "high":
+        filtered = butter_highpass_filter(signal, args.cutoff, args.fs, args.order)
+    else:
+        filtered = butter_bandpass_filter(signal, args.lowcut, args.highcut, args.fs, args.order)
+    plot_filtered_data(signal, filtered, f"{args.kind.capitalize()}-Pass Filter", args.output)
+    return 0
+
+def cmd_fft(args):
+    from data_transformation import perform_fft
+
+    perform_fft(_load_csv(args.file)[args.column].values, args.fs, output_file=args.output)
+    return 0
+
+def cmd_stats(args):
+    import numpy as np
+    from statistical_analysis import calculate_descriptive_statistics, plot_correlation_matrix
+
+    numeric_data = _load_csv(args.file).select_dtypes(include=[np.number])
+    calculate_descriptive_statistics(numeric_data)
+    if args.correlation:
+        plot_correlation_matrix(numeric_data, output_file=args.output)
+    return 0
+
+def cmd_plot(args):
+    from time_series_plotting import plot_time_series, plot_time_series_interactive
+
+    data = _load_csv(args.file)
+    if args.interactive:
+        plot_time_series_interactive(data, args.columns)
+    else:
+        plot_time_series(data, args.columns, output_file=args.output)
+    return 0
+
+def cmd_attitude(args):
+    from instrumentation import show
+    from attitude_control_analysis import validate_quaternion, quaternion_to_euler_angles, plot_orientation
+
+    data = _load_csv(args.file)
+    quaternions = data[["q0", "q1", "q2", "q3"]]
+    data["quaternion_valid"] = quaternions.apply(lambda q: validate_quaternion(q.values), axis=1)
+    show("Quaternion Validation Results:", data[["timestamp", "quaternion_valid"]], sep="\n")
+    if args.plot:
+        import pandas as pd
+
+        data[["roll", "pitch", "yaw"]] = quaternions.apply(lambda q: pd.Series(quaternion_to_euler_angles(q.values)),
+                                                           axis=1)
+        plot_orientation(data, "Spacecraft Orientation Over Time", args.output)
+    return 0
+
+def cmd_orientation(args):
+    from orientation_3d_visualization import plot_3d_orientation
+
+    plot_3d_orientation(_load_csv(args.file), output_file=args.output)
+    return 0
+
+def cmd_orbit(args):
+    import numpy as np
+    from orbital_analysis import calculate_orbital_elements
+
+    elements = calculate_orbital_elements(np.array(args.position), np.array(args.velocity), mu=args.mu)
+    print("Orbital Elements:")
+    for key, value in elements.items():
+        print(f"{key}: {value:.4f}")
+    return 0
+
+def cmd_compress(args):
+    from data_compression_storage import compress_to_csv_gzip, compress_to_parquet
+
+    data = _load_csv(args.file, parse_dates=False)
+    if args.format == "gzip":
+        compress_to_csv_gzip(data, args.output)
+    else:
+        compress_to_parquet(data, args.output)
+    return 0
+
+def cmd_rollups(args):
+    from instrumentation import show
+    from telemetry_rollups import build_rollups, query_rollups, save_rollups
+
+    data = _load_csv(args.file)
+    rollups = build_rollups(data, args.columns)
+    level, trends = query_rollups(rollups, args.start or data["timestamp"].min(),
+                                  args.end or data["timestamp"].max(), args.max_points)
+    print(f"Query answered from the {level} level:")
+    show(trends)
+    if args.save_dir:
+        save_rollups(rollups, args.save_dir)
+    return 0
+
+def cmd_pipeline(args):
+    from pipeline import build_default_pipeline
+
+    pipeline = build_default_pipeline(args.file, args.column, cache_dir=args.cache_dir, max_workers=args.workers)
+    pipeline.run()
+    return 0
+
+def cmd_generate(args):
+    from synthetic_telemetry import write_synthetic_csv
+
+    write_synthetic_csv(args.kind, int(float(args.rows)), args.output, seed=args.seed, cadence_s=args.cadence_s)
+    return 0
+
+def cmd_live(args):
+    import asyncio
+    from live_ingestion import LiveTelemetryService, print_results
+
+    limits = None
+    if args.limits:
+        from limit_checking import load_limits
+        limits = load_limits(args.limits)
+    thresholds = {}
+    for item in args.thresholds:
+        column, value = item.split("=")
+        thresholds[column] = float(value)
+
+    async def serve():
+        service = LiveTelemetryService(args.channels, z_score_columns=args.z_columns, z_threshold=args.z_threshold,
+                                       thresholds=thresholds, limits=limits, energy_columns=args.energy,
+                                       batch_records=args.batch_records, max_latency_s=args.max_latency_s)
+        if args.protocol in ("tcp", "both"):
+            await service.start_tcp(args.host, args.port)
+        if args.protocol in ("udp", "both"):
+            await service.start_udp(args.host, args.port)
+        tasks = [asyncio.create_task(print_results(service.subscribe())), asyncio.create_task(service.run())]
+        try:
+            await asyncio.sleep(args.duration if args.duration else float("inf"))
+        finally:
+            await service.stop()
+            await asyncio.gather(*tasks)
+            print(f"Service statistics: {service.stats}")
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def cmd_replay(args):
+    import asyncio
+    from live_ingestion import replay_csv
+
+    asyncio.run(replay_csv(args.file, args.port, host=args.host, protocol=args.protocol, rate_hz=args.rate_hz or None,
+                           records_per_packet=args.records_per_packet, channels=args.channels, loops=args.loops))
+    return 0
+
+def cmd_fleet(args):
+    from fleet_runner import run_fleet, retry_failed
+
+    if args.retry_failed:
+        retry_failed(args.work_dir)
+    run_fleet(args.data_root, args.work_dir, args.output_dir, analyses=args.analyses, workers=args.workers,
+              max_retries=args.max_retries, lease_s=args.lease_s)
+    return 0
+
+def cmd_fleet_worker(args):
+    from fleet_runner import worker_loop
+
+    print(worker_loop(args.work_dir, max_retries=args.max_retries, lease_s=args.lease_s))
+    return 0
+
+def cmd_cache(args):
+    from result_cache import cache_info, clear_cache
+
+    if args.clear:
+        clear_cache()
+    print(cache_info())
+    return 0
+
+def cmd_metrics(args):
+    from instrumentation import summarize_metrics
+
+    summarize_metrics(args.file)
+    return 0
+
+def build_parser():
+    """
+    Builds the argument parser with one subcommand per analysis.
+
+    Returns:
+    argparse.ArgumentParser: The parser.
+    """
+    parser = argparse.ArgumentParser(prog="spacecraft_cli", description="Spacecraft telemetry analysis tools.")
+    parser.add_argument("--quiet", action="store_true", help="Do not print DataFrames and other verbose output.")
+    parser.add_argument("--metrics-file", default=None,
+                        help="Append per-call timing/memory/row metrics to this JSON-lines file.")
+    parser.add_argument("--track-allocations", action="store_true",
+                        help="Also record peak allocations per call (slower).")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute instead of using cached results.")
+    parser.add_argument("--cache-dir", default=None, help="Folder of the on-disk result cache.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def command(name, handler, help_text, file_default="data/sample_data.csv"):
+        sub = commands.add_parser(name, help=help_text)
+        sub.add_argument("--file", default=file_default, help="Input CSV file.")
+        sub.set_defaults(handler=handler)
+        return sub
+
+    sub = command("ingest", cmd_ingest, "Describe and clean a telemetry file.")
+    sub.add_argument("--output", default="outputs/cleaned_data.csv")
+
+    sub = command("threshold", cmd_threshold, "Threshold-based anomaly detection.")
+    sub.add_argument("--column", default="temperature_c")
+    sub.add_argument("--threshold", type=float, required=True)
+    sub.add_argument("--output", default="outputs/anomalies/threshold_anomalies.csv")
+
+    sub = command("zscore", cmd_zscore, "Z-score anomaly detection.")
+    sub.add_argument("--column", default="temperature_c")
+    sub.add_argument("--threshold", type=float, default=3.0)
+    sub.add_argument("--output", default="outputs/anomalies/z_score_anomalies.csv")
+
+    sub = command("isolation-forest", cmd_isolation_forest, "Isolation Forest anomaly detection.")
+    sub.add_argument("--column", default="temperature_c")
+    sub.add_argument("--contamination", type=float, default=0.05)
+    sub.add_argument("--output", default="outputs/anomalies/isolation_forest_anomalies.csv")
+
+    sub = command("discords", cmd_discords, "Matrix-profile discord (anomalous shape) search.",
+                  file_default="data/sample_temperature_data.csv")
+    sub.add_argument("--columns", nargs="+", default=["temperature_c"])
+    sub.add_argument("--window", type=int, required=True, help="Subsequence length in samples.")
+    sub.add_argument("--top-k", type=int, default=3)
+    sub.add_argument("--workers", type=int, default=None)
+    sub.add_argument("--output", default="outputs/anomalies/matrix_profile_discords.csv")
+
+    sub = command("limits", cmd_limits, f"Check all channels against a limits table (exit code {RED_LIMIT_EXIT_CODE} on a red breach; "
+                  "2 is argparse's usage error).",
+                  file_default="data/sample_power_data.csv")
+    sub.description = (f"Checks every channel against its red/yellow limits. Exits with status {RED_LIMIT_EXIT_CODE} "
+                       "when any sample breaches a red limit (status 2 means a command-line error).")
+    sub.add_argument("--limits", default="data/sample_limits.csv")
+    sub.add_argument("--mode-column", default=None)
+    sub.add_argument("--output", default="outputs/anomalies/limit_violations.csv")
+
+    sub = command("thermal-events", cmd_thermal_events, "Extract over-limit events with hysteresis.",
+                  file_default="data/sample_temperature_data.csv")
+    sub.add_argument("--columns", nargs="+", default=["temperature_c"])
+    sub.add_argument("--limit", type=float, required=True)
+    sub.add_argument("--hysteresis", type=float, default=0.0)
+    sub.add_argument("--min-duration", type=float, default=0.0)
+    sub.add_argument("--time-column", default="timestamp")
+    sub.add_argument("--output", default="outputs/temperature_events.csv")
+
+    sub = command("heat-fit", cmd_heat_fit, "Fit the heat dissipation model.",
+                  file_default="data/sample_temperature_data.csv")
+    sub.add_argument("--column", default="temperature_c")
+    sub.add_argument("--time-column", default="time_s")
+    sub.add_argument("--output", default="outputs/heat_dissipation_fit.png")
+
+    sub = command("battery", cmd_battery, "Simulate battery state of charge with per-orbit summaries.",
+                  file_default="data/sample_power_data.csv")
+    sub.add_argument("--generation-column", default="power_generation_w")
+    sub.add_argument("--consumption-column", default="power_consumption_w")
+    sub.add_argument("--capacity-wh", type=float, required=True)
+    sub.add_argument("--initial-soc", type=float, default=1.0)
+    sub.add_argument("--charge-efficiency", type=float, default=0.95)
+    sub.add_argument("--discharge-efficiency", type=float, default=0.95)
+    sub.add_argument("--min-soc", type=float, default=0.0)
+    sub.add_argument("--orbit-period-s", type=float, default=5400.0)
+    sub.add_argument("--output", default="outputs/battery_orbits.csv")
+
+    sub = command("power", cmd_power, "Plot power trends and energy balance.",
+                  file_default="data/sample_power_data.csv")
+    sub.add_argument("--generation-column", default="power_generation_w")
+    sub.add_argument("--consumption-column", default="power_consumption_w")
+
+    sub = command("filter", cmd_filter, "Apply a Butterworth filter.", file_default="outputs/cleaned_data.csv")
+    sub.add_argument("--column", default="temperature_c")
+    sub.add_argument("--kind", choices=["low", "high", "band"], default="low")
+    sub.add_argument("--fs", type=float, default=1.0)
+    sub.add_argument("--cutoff", type=float, default=0.1)
+    sub.add_argument("--lowcut", type=float, default=0.01)
+    sub.add_argument("--highcut", type=float, default=0.1)
+    sub.add_argument("--order", type=int, default=4)
+    sub.add_argument("--output", default="outputs/filtered.png")
+
+    sub = command("fft", cmd_fft, "Frequency spectrum of a channel.")
+    sub.add_argument("--column", default="temperature_c")
+    sub.add_argument("--fs", type=float, default=1.0)
+    sub.add_argument("--output", default="outputs/fft_analysis.png")
+
+    sub = command("stats", cmd_stats, "Descriptive statistics (and correlation matrix).")
+    sub.add_argument("--correlation", action="store_true")
+    sub.add_argument("--output", default="outputs/correlation_matrix.png")
+
+    sub = command("plot", cmd_plot, "Time-series plot.")
+    sub.add_argument("--columns", nargs="+", default=["temperature_c", "voltage_v"])
+    sub.add_argument("--interactive", action="store_true")
+    sub.add_argument("--output", default="outputs/time_series_plot.png")
+
+    sub = command("attitude", cmd_attitude, "Validate quaternions (and plot Euler angles).",
+                  file_default="data/sample_attitude_data.csv")
+    sub.add_argument("--plot", action="store_true")
+    sub.add_argument("--output", default="outputs/orientation_plot.png")
+
+    sub = command("orientation", cmd_orientation, "3D orientation plot.", file_default="data/orientation_sample.csv")
+    sub.add_argument("--output", default="outputs/orientation_3d.png")
+
+    sub = commands.add_parser("orbit", help="Keplerian elements from a state vector.")
+    sub.add_argument("--position", type=float, nargs=3, required=True, metavar=("X", "Y", "Z"))
+    sub.add_argument("--velocity", type=float, nargs=3, required=True, metavar=("VX", "VY", "VZ"))
+    sub.add_argument("--mu", type=float, default=398600.4418)
+    sub.set_defaults(handler=cmd_orbit)
+
+    sub = command("compress", cmd_compress, "Compress a dataset.", file_default="data/sample_temperature_data.csv")
+    sub.add_argument("--format", choices=["gzip", "parquet"], default="gzip")
+    sub.add_argument("--output", default="outputs/compressed_data.csv.gz")
+
+    sub = command("rollups", cmd_rollups, "Build rollups and query a span.", file_default="data/sample_power_data.csv")
+    sub.add_argument("--columns", nargs="+", default=["power_generation_w", "power_consumption_w"])
+    sub.add_argument("--start", default=None)
+    sub.add_argument("--end", default=None)
+    sub.add_argument("--max-points", type=int, default=2000)
+    sub.add_argument("--save-dir", default=None)
+
+    sub = command("pipeline", cmd_pipeline, "Run the cached in-memory analysis pipeline.")
+    sub.add_argument("--column", default="temperature_c")
+    sub.add_argument("--cache-dir", default="outputs/pipeline_cache")
+    sub.add_argument("--workers", type=int, default=4)
+
+    sub = commands.add_parser("generate", help="Write seeded synthetic telemetry to CSV.")
+    sub.add_argument("--kind", choices=["housekeeping", "temperature", "power", "attitude", "gyro", "orientation",
+                                        "orbit"], default="housekeeping")
+    sub.add_argument("--rows", default="1e6", help="Number of rows, e.g. 1e6.")
+    sub.add_argument("--seed", type=int, default=0)
+    sub.add_argument("--cadence-s", type=float, default=1.0)
+    sub.add_argument("--output", default="outputs/synthetic/telemetry.csv")
+    sub.set_defaults(handler=cmd_generate)
+
+    sub = commands.add_parser("live", help="Receive live framed telemetry and analyse it incrementally.")
+    sub.add_argument("--protocol", choices=["tcp", "udp", "both"], default="tcp")
+    sub.add_argument("--host", default="127.0.0.1")
+    sub.add_argument("--port", type=int, default=5555)
+    sub.add_argument("--channels", nargs="+", default=["power_generation_w", "power_consumption_w"],
+                     help="Channel names in packet order.")
+    sub.add_argument("--z-columns", nargs="*", default=[])
+    sub.add_argument("--z-threshold", type=float, default=3.0)
+    sub.add_argument("--thresholds", nargs="*", default=[], metavar="COLUMN=VALUE")
+    sub.add_argument("--limits", default=None, help="Limits table CSV.")
+    sub.add_argument("--energy", nargs=2, default=None, metavar=("GENERATION", "CONSUMPTION"))
+    sub.add_argument("--batch-records", type=int, default=256)
+    sub.add_argument("--max-latency-s", type=float, default=0.25)
+    sub.add_argument("--duration", type=float, default=None, help="Seconds to run (default: until interrupted).")
+    sub.set_defaults(handler=cmd_live)
+
+    sub = command("replay", cmd_replay, "Replay a telemetry CSV to a live service.",
+                  file_default="data/sample_power_data.csv")
+    sub.add_argument("--protocol", choices=["tcp", "udp"], default="tcp")
+    sub.add_argument("--host", default="127.0.0.1")
+    sub.add_argument("--port", type=int, default=5555)
+    sub.add_argument("--rate-hz", type=float, default=100.0, help="Samples per second (0 for as fast as possible).")
+    sub.add_argument("--records-per-packet", type=int, default=1)
+    sub.add_argument("--channels", nargs="+", default=None)
+    sub.add_argument("--loops", type=int, default=1)
+
+    sub = commands.add_parser("fleet", help="Run every analysis for every spacecraft and day on a process pool.")
+    sub.add_argument("--data-root", default="outputs/synthetic_fleet",
+                     help="Folder laid out as <spacecraft>/<day>/<kind>.csv.")
+    sub.add_argument("--work-dir", default="outputs/fleet_work", help="Work queue folder (reuse it to resume).")
+    sub.add_argument("--output-dir", default="outputs/fleet")
+    sub.add_argument("--analyses", nargs="+", default=None,
+                     choices=["statistics", "z_score", "isolation_forest", "orbit"])
+    sub.add_argument("--workers", type=int, default=None, help="Worker processes (default: number of CPUs).")
+    sub.add_argument("--max-retries", type=int, default=2)
+    sub.add_argument("--lease-s", type=float, default=60.0)
+    sub.add_argument("--retry-failed", action="store_true", help="Requeue the tasks that failed in a previous run.")
+    sub.set_defaults(handler=cmd_fleet)
+
+    sub = commands.add_parser("fleet-worker", help="Join a fleet job as an extra worker process.")
+    sub.add_argument("--work-dir", default="outputs/fleet_work")
+    sub.add_argument("--max-retries", type=int, default=2)
+    sub.add_argument("--lease-s", type=float, default=60.0)
+    sub.set_defaults(handler=cmd_fleet_worker)
+
+    sub = commands.add_parser("cache", help="Show (or clear) the on-disk result cache.")
+    sub.add_argument("--clear", action="store_true")
+    sub.set_defaults(handler=cmd_cache)
+
+    sub = command("metrics", cmd_metrics, "Summarize a metrics file per function.",
+                  file_default="outputs/metrics.jsonl")
+
+    return parser
+
+def main(argv=None):
+    """
+    Entry point: parses the command line and runs the chosen analysis.
+
+    Parameters:
+    argv (list): Arguments (defaults to sys.argv[1:]).
+
+    Returns:
+    int: Process exit code.
+    """
+    args = build_parser().parse_args(argv)
+    if args.quiet or args.metrics_file or args.track_allocations:
+        from instrumentation import configure
+
+        configure(metrics_file=args.metrics_file, quiet=args.quiet or None,
+                  track_allocations=args.track_allocations or None)
+    if args.no_cache or args.cache_dir:
+        from result_cache import configure as configure_cache
+
+        configure_cache(cache_dir=args.cache_dir, enabled=False if args.no_cache else None)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,9 @@
 import pandas as pd
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
+from instrumentation import instrument, show
+from result_cache import memoize, cached_output_file
 
+@instrument
 def calculate_descriptive_statistics(data):
     """
     Calculates and prints descriptive statistics for numerical columns.
@@ -14,30 +15,47 @@ def calculate_descriptive_statistics(data):
     Returns:
     pd.DataFrame: DataFrame containing descriptive statistics.
     """
-    print("\nDescriptive Statistics:")
+    show("\nDescriptive Statistics:")
     stats = data.describe().T
-    print(stats)
+    show(stats)
     return stats
 
+@memoize
+def _correlation_matrix(data):
+    """
+    Returns the Pearson correlation matrix of the columns as an array (cached on disk).
+    """
+    return data.corr().to_numpy()
+
+@instrument
 def plot_correlation_matrix(data, output_file="outputs/correlation_matrix.png"):
     """
     Generates a correlation matrix heatmap for numerical variables.
 
+    The correlation matrix and the heatmap are cached (see result_cache.cached_output_file).
+
     Parameters:
     data (pd.DataFrame): The dataset.
     output_file (str): Path to save the heatmap.
     """
     print("\nGenerating Correlation Matrix...")
-    corr_matrix = data.corr()
-    print(corr_matrix)
-
-    # Plot the correlation matrix
-    plt.figure(figsize=(8, 6))
-    sns.heatmap(corr_matrix, annot=True, cmap="coolwarm", fmt=".2f")
-    plt.title("Correlation Matrix")
-    plt.savefig(output_file)
+    corr_matrix = pd.DataFrame(_correlation_matrix(data), index=data.columns, columns=data.columns)
+    show(corr_matrix)
+
+    def render():
+        import seaborn as sns
+        import matplotlib.pyplot as plt
+
+        # Plot the correlation matrix
+        plt.figure(figsize=(8, 6))
+        sns.heatmap(corr_matrix, annot=True, cmap="coolwarm", fmt=".2f")
+        plt.title("Correlation Matrix")
+        plt.savefig(output_file)
+        plt.show()
+
+    cached_output_file(output_file, render, plot_correlation_matrix, corr_matrix.values, list(map(str, data.columns)),
+                       shows_figure=True)
     print(f"Correlation matrix heatmap saved to {output_file}")
-    plt.show()
 
 if __name__ == "__main__":
     # Load the cleaned dataset
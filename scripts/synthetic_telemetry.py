@@ -0,0 +1,177 @@
+import itertools
+import os
+import pandas as pd
+import numpy as np
+from instrumentation import instrument
+
+# Telemetry kinds, matching the layout of the sample files in data/
+KINDS = ["housekeeping", "temperature", "power", "attitude", "gyro", "orientation", "orbit"]
+
+EARTH_MU = 398600.4418  # km^3/s^2
+
+def _housekeeping(t, rng, orbit_period_s):
+    phase = 2 * np.pi * t / orbit_period_s
+    temperature = 22.0 + 1.5 * np.sin(phase) + rng.normal(0, 0.1, t.size)
+    # A few isolated spikes so the anomaly detectors have something to find
+    spikes = rng.random(t.size) < 1e-4
+    temperature[spikes] += rng.uniform(3, 8, spikes.sum())
+    return {
+        "temperature_c": temperature,
+        "power_consumption_w": 120.0 + 2.0 * np.sin(phase + 0.5) + rng.normal(0, 0.5, t.size),
+        "voltage_v": 3.3 + 0.1 * np.sin(phase) + rng.normal(0, 0.02, t.size),
+    }
+
+def _temperature(t, rng, orbit_period_s):
+    phase = 2 * np.pi * t / orbit_period_s
+    return {
+        "temperature_c": 35.0 + 15.0 * np.sin(phase) + rng.normal(0, 0.5, t.size),
+        "time_s": t,
+    }
+
+def _power(t, rng, orbit_period_s):
+    # Sunlit for the first ~65 % of every orbit, eclipse for the rest
+    sunlit = (t % orbit_period_s) < 0.65 * orbit_period_s
+    return {
+        "power_generation_w": np.where(sunlit, 150.0 + rng.normal(0, 2.0, t.size), 0.0),
+        "power_consumption_w": 110.0 + 15.0 * (rng.random(t.size) < 0.05) + rng.normal(0, 1.5, t.size),
+    }
+
+def _attitude(t, rng, orbit_period_s):
+    # Slow rotation about a tilted axis plus small jitter, renormalised
+    angle = 2 * np.pi * t / orbit_period_s
+    axis = np.array([0.2, 0.3, 0.93])
+    axis = axis / np.linalg.norm(axis)
+    q = np.column_stack([np.cos(angle / 2), *(np.sin(angle / 2)[None, :] * axis[:, None])])
+    q += rng.normal(0, 1e-3, q.shape)
+    q /= np.linalg.norm(q, axis=1, keepdims=True)
+    return {"q0": q[:, 0], "q1": q[:, 1], "q2": q[:, 2], "q3": q[:, 3]}
+
+def _gyro(t, rng, orbit_period_s):
+    phase = 2 * np.pi * t / orbit_period_s
+    return {
+        "roll": 10.0 * np.sin(phase) + rng.normal(0, 0.2, t.size),
+        "pitch": 5.0 * np.sin(2 * phase) + rng.normal(0, 0.2, t.size),
+        "yaw": 15.0 * np.cos(phase) + rng.normal(0, 0.2, t.size),
+    }
+
+def _orientation(t, rng, orbit_period_s):
+    angles = _gyro(t, rng, orbit_period_s)
+    return {"roll_deg": angles["roll"], "pitch_deg": angles["pitch"], "yaw_deg": angles["yaw"]}
+
+def _orbit(t, rng, orbit_period_s):
+    # Circular orbit with the requested period, 51.6 deg inclination, small position noise (km)
+    radius = (EARTH_MU * (orbit_period_s / (2 * np.pi)) ** 2) ** (1 / 3)
+    speed = np.sqrt(EARTH_MU / radius)
+    phase = 2 * np.pi * t / orbit_period_s
+    inclination = np.radians(51.6)
+    x, y = radius * np.cos(phase), radius * np.sin(phase)
+    vx, vy = -speed * np.sin(phase), speed * np.cos(phase)
+    return {
+        "x_km": x + rng.normal(0, 0.01, t.size),
+        "y_km": y * np.cos(inclination) + rng.normal(0, 0.01, t.size),
+        "z_km": y * np.sin(inclination) + rng.normal(0, 0.01, t.size),
+        "vx_km_s": vx,
+        "vy_km_s": vy * np.cos(inclination),
+        "vz_km_s": vy * np.sin(inclination),
+    }
+
+_GENERATORS = {
+    "housekeeping": _housekeeping,
+    "temperature": _temperature,
+    "power": _power,
+    "attitude": _attitude,
+    "gyro": _gyro,
+    "orientation": _orientation,
+    "orbit": _orbit,
+}
+
+def iter_telemetry_chunks(kind, n_rows, chunk_size=1000000, seed=0, start="2024-11-01", cadence_s=1.0,
+                          orbit_period_s=5400.0, dtype=np.float64):
+    """
+    Yields synthetic telemetry in chunks, so very long records never need to fit in memory.
+
+    Signals are functions of the absolute sample time and the noise of chunk i is drawn
+    from (seed, i), so the output is reproducible for a given seed and chunk size.
+
+    Parameters:
+    kind (str): One of KINDS.
+    n_rows (int): Total number of rows.
+    chunk_size (int): Rows per chunk.
+    seed (int): Random seed.
+    start (str): Timestamp of the first sample.
+    cadence_s (float): Sampling interval (s).
+    orbit_period_s (float): Orbital period driving the periodic signals (s).
+    dtype: Float dtype of the telemetry columns.
+
+    Yields:
+    pd.DataFrame: Chunks with a timestamp column and the kind's telemetry columns (one empty chunk for n_rows=0).
+    """
+    if kind not in _GENERATORS:
+        raise ValueError(f"Unsupported telemetry kind '{kind}'. Choose from {', '.join(KINDS)}.")
+    start = pd.Timestamp(start)
+    cadence_ns = int(round(cadence_s * 1e9))
+    for index, offset in enumerate(range(0, max(int(n_rows), 1), chunk_size)):
+        rng = np.random.default_rng([seed, index])
+        rows = np.arange(offset, min(offset + chunk_size, int(n_rows)), dtype=np.int64)
+        t = rows * cadence_s
+        columns = _GENERATORS[kind](t, rng, orbit_period_s)
+        chunk = pd.DataFrame({"timestamp": start + pd.to_timedelta(rows * cadence_ns, unit="ns")})
+        for name, values in columns.items():
+            chunk[name] = values.astype(dtype)
+        yield chunk
+
+@instrument
+def generate_telemetry(kind, n_rows, seed=0, **kwargs):
+    """
+    Generates a synthetic telemetry DataFrame in memory.
+
+    Parameters:
+    kind (str): One of KINDS.
+    n_rows (int): Number of rows.
+    seed (int): Random seed.
+    kwargs: Passed to iter_telemetry_chunks (start, cadence_s, orbit_period_s, dtype, chunk_size).
+
+    Returns:
+    pd.DataFrame: The synthetic telemetry.
+    """
+    chunks = iter_telemetry_chunks(kind, n_rows, seed=seed, **kwargs)
+    first = next(chunks)
+    if len(first) == int(n_rows):
+        return first
+    # Fill preallocated arrays chunk by chunk, so peak memory is the output plus one chunk.
+    # The channels share one 2-D block (a column per row) that the DataFrame wraps without copying.
+    names = [name for name in first.columns if name != "timestamp"]
+    timestamps = np.empty(int(n_rows), dtype=first["timestamp"].dtype)
+    values = np.empty((len(names), int(n_rows)), dtype=first[names[0]].dtype)
+    offset = 0
+    for chunk in itertools.chain([first], chunks):
+        timestamps[offset:offset + len(chunk)] = chunk["timestamp"].to_numpy()
+        for row, name in enumerate(names):
+            values[row, offset:offset + len(chunk)] = chunk[name].to_numpy()
+        offset += len(chunk)
+    data = pd.DataFrame(values.T, columns=names, copy=False)
+    data.insert(0, "timestamp", timestamps)
+    return data
+
+@instrument
+def write_synthetic_csv(kind, n_rows, output_file, seed=0, chunk_size=1000000, **kwargs):
+    """
+    Writes synthetic telemetry to a CSV file chunk by chunk.
+
+    Parameters:
+    kind (str): One of KINDS.
+    n_rows (int): Number of rows.
+    output_file (str): Path to save the CSV file.
+    seed (int): Random seed.
+    chunk_size (int): Rows generated and written per chunk.
+    kwargs: Passed to iter_telemetry_chunks.
+    """
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    for index, chunk in enumerate(iter_telemetry_chunks(kind, n_rows, chunk_size, seed, **kwargs)):
+        chunk.to_csv(output_file, mode="w" if index == 0 else "a", header=index == 0, index=False)
+    print(f"{n_rows} rows of synthetic {kind} telemetry saved to {output_file}")
+
+if __name__ == "__main__":
+    # A day of 1 Hz telemetry of every kind
+    for kind in KINDS:
+        write_synthetic_csv(kind, 86400, f"outputs/synthetic/{kind}.csv")
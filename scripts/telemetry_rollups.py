@@ -0,0 +1,229 @@
+import os
+import pandas as pd
+from instrumentation import instrument, show
+
+# IMPORTANT:
+# Saving and loading rollups uses Parquet, so you may need to pip install: pyarrow
+
+# Rollup levels, finest first. Each level is built from the one before it.
+ROLLUP_LEVELS = ["1min", "1h", "1D"]
+
+def _channels(rollup):
+    """
+    Returns the channel names stored in a rollup table.
+    """
+    return [column[:-len("_count")] for column in rollup.columns if column.endswith("_count")]
+
+def _combine_rules(rollup):
+    """
+    Returns how each rollup column is combined when bins are merged.
+    """
+    rules = {}
+    for channel in _channels(rollup):
+        rules.update({
+            f"{channel}_min": "min",
+            f"{channel}_max": "max",
+            f"{channel}_sum": "sum",
+            f"{channel}_count": "sum",
+        })
+    return rules
+
+def _aggregate_raw(data, columns, time_column, freq):
+    """
+    Aggregates raw samples into min/max/sum/count bins of width freq.
+    """
+    bins = pd.to_datetime(data[time_column]).dt.floor(freq)
+    stats = data[columns].groupby(bins.values).agg(["min", "max", "sum", "count"])
+    stats.columns = [f"{channel}_{stat}" for channel, stat in stats.columns]
+    stats.index.name = "bin_start"
+    return stats
+
+def _coarsen(rollup, freq):
+    """
+    Aggregates a finer rollup table into bins of width freq.
+    """
+    coarse = rollup.groupby(rollup.index.floor(freq)).agg(_combine_rules(rollup))
+    coarse.index.name = "bin_start"
+    return coarse
+
+def _merge(old, new):
+    """
+    Merges two rollup tables of the same level; bins present in both are combined.
+    """
+    overlap_start = new.index.min()
+    tail = pd.concat([old[old.index >= overlap_start], new])
+    tail = tail.groupby(level=0).agg(_combine_rules(tail))
+    merged = pd.concat([old[old.index < overlap_start], tail])
+    merged.index.name = "bin_start"
+    return merged
+
+@instrument
+def build_rollups(data, columns, time_column="timestamp", levels=ROLLUP_LEVELS):
+    """
+    Builds a multi-resolution rollup pyramid (min/max/sum/count per channel and bin).
+
+    Only the finest level is computed from raw samples; every coarser level is
+    aggregated from the level below it.
+
+    Parameters:
+    data (pd.DataFrame): Raw telemetry.
+    columns (list): Channels to roll up.
+    time_column (str): Column name for timestamps.
+    levels (list): Pandas frequency strings, finest first.
+
+    Returns:
+    dict: Level -> pd.DataFrame indexed by bin start.
+    """
+    rollups = {levels[0]: _aggregate_raw(data, columns, time_column, levels[0])}
+    for finer, level in zip(levels, levels[1:]):
+        rollups[level] = _coarsen(rollups[finer], level)
+    return rollups
+
+@instrument
+def update_rollups(rollups, new_data, columns, time_column="timestamp", levels=ROLLUP_LEVELS):
+    """
+    Adds newly arrived raw telemetry to an existing rollup pyramid.
+
+    Only the bins touched by the new samples are recomputed at each level, so the
+    cost depends on the size of the new data rather than the archive.
+
+    Parameters:
+    rollups (dict): Pyramid from build_rollups (updated in place); may be empty.
+    new_data (pd.DataFrame): Newly arrived raw telemetry.
+    columns (list): Channels to roll up.
+    time_column (str): Column name for timestamps.
+    levels (list): Pandas frequency strings, finest first.
+
+    Returns:
+    dict: The updated pyramid.
+    """
+    if not rollups:
+        rollups.update(build_rollups(new_data, columns, time_column, levels))
+        return rollups
+    if new_data.empty:
+        return rollups
+
+    fresh = _aggregate_raw(new_data, columns, time_column, levels[0])
+    rollups[levels[0]] = _merge(rollups[levels[0]], fresh)
+    for finer, level in zip(levels, levels[1:]):
+        # Rebuild the coarse bins from the first one touched onwards
+        first_bin = fresh.index.min().floor(level)
+        finer_table = rollups[finer]
+        rebuilt = _coarsen(finer_table[finer_table.index >= first_bin], level)
+        coarse = rollups[level]
+        rollups[level] = pd.concat([coarse[coarse.index < first_bin], rebuilt])
+        fresh = rebuilt
+    return rollups
+
+@instrument
+def query_rollups(rollups, start, end, max_points=2000, columns=None):
+    """
+    Returns aggregated telemetry for a time span from the most suitable level.
+
+    Picks the finest level whose bin count over the span stays within max_points,
+    falling back to the coarsest level for very long spans.
+
+    Parameters:
+    rollups (dict): Pyramid from build_rollups.
+    start (str or datetime): Start of the span (inclusive).
+    end (str or datetime): End of the span (inclusive).
+    max_points (int): Maximum number of bins wanted, e.g. the plot width in pixels.
+    columns (list): Channels to return; defaults to all.
+
+    Returns:
+    tuple: (str, pd.DataFrame) with the chosen level and per-bin min, max, mean and
+    count columns for each channel.
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    levels = list(rollups)
+    level = levels[-1]
+    for candidate in levels:
+        if (end - start) / pd.Timedelta(candidate) <= max_points:
+            level = candidate
+            break
+
+    table = rollups[level]
+    table = table[(table.index >= start.floor(level)) & (table.index <= end)]
+    result = pd.DataFrame(index=table.index)
+    for channel in columns or _channels(table):
+        result[f"{channel}_min"] = table[f"{channel}_min"]
+        result[f"{channel}_max"] = table[f"{channel}_max"]
+        result[f"{channel}_mean"] = table[f"{channel}_sum"] / table[f"{channel}_count"]
+        result[f"{channel}_count"] = table[f"{channel}_count"]
+    return level, result
+
+@instrument
+def save_rollups(rollups, directory="outputs/rollups"):
+    """
+    Saves each rollup level to a Parquet file.
+
+    Parameters:
+    rollups (dict): Pyramid from build_rollups.
+    directory (str): Folder to save the level files into.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for level, table in rollups.items():
+        table.to_parquet(os.path.join(directory, f"rollup_{level}.parquet"))
+    print(f"Rollups ({', '.join(rollups)}) saved to {directory}")
+
+@instrument
+def load_rollups(directory="outputs/rollups", levels=ROLLUP_LEVELS):
+    """
+    Loads rollup levels saved by save_rollups.
+
+    Parameters:
+    directory (str): Folder containing the level files.
+    levels (list): Levels to load, finest first.
+
+    Returns:
+    dict: Level -> pd.DataFrame indexed by bin start.
+    """
+    return {level: pd.read_parquet(os.path.join(directory, f"rollup_{level}.parquet")) for level in levels}
+
+@instrument
+def plot_rollup_trends(rollups, columns, start, end, max_points=2000, output_file="outputs/rollup_trends.png"):
+    """
+    Plots long-range trends as a mean line with a min/max envelope.
+
+    Parameters:
+    rollups (dict): Pyramid from build_rollups.
+    columns (list): Channels to plot.
+    start (str or datetime): Start of the span.
+    end (str or datetime): End of the span.
+    max_points (int): Maximum number of bins to draw.
+    output_file (str): Path to save the plot.
+    """
+    import matplotlib.pyplot as plt
+
+    level, trends = query_rollups(rollups, start, end, max_points, columns)
+    plt.figure(figsize=(10, 6))
+    for column in columns:
+        line, = plt.plot(trends.index, trends[f"{column}_mean"], label=column)
+        plt.fill_between(trends.index, trends[f"{column}_min"], trends[f"{column}_max"],
+                         color=line.get_color(), alpha=0.2)
+    plt.xlabel("Time")
+    plt.ylabel("Values")
+    plt.title(f"Telemetry Trends ({level} rollup)")
+    plt.legend()
+    plt.grid()
+    plt.savefig(output_file)
+    print(f"Rollup trends plot saved to {output_file}")
+    plt.show()
+
+if __name__ == "__main__":
+    # Load the dataset
+    file_path = "data/sample_power_data.csv"
+    data = pd.read_csv(file_path, parse_dates=["timestamp"])
+    columns = ["power_generation_w", "power_consumption_w"]
+
+    # Build the pyramid from the first half, then add the rest as it "arrives"
+    rollups = build_rollups(data.iloc[:5], columns)
+    update_rollups(rollups, data.iloc[5:], columns)
+    for level, table in rollups.items():
+        print(f"\n{level} rollup: {len(table)} bins")
+
+    # Query a span and plot the trends from the chosen level
+    level, trends = query_rollups(rollups, data["timestamp"].min(), data["timestamp"].max(), max_points=100)
+    print(f"\nQuery answered from the {level} level:")
+    show(trends)
+    plot_rollup_trends(rollups, columns, data["timestamp"].min(), data["timestamp"].max(), max_points=100)
@@ -1,8 +1,11 @@
+import os
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.optimize import curve_fit
+from instrumentation import instrument, show
+from result_cache import memoize, cached_output_file
+from data_transformation import to_seconds
 
+@instrument
 def track_temperature_changes(data, column, output_file="outputs/temperature_trends.png"):
     """
     Plots temperature changes over time.
@@ -12,6 +15,8 @@ def track_temperature_changes(data, column, output_file="outputs/temperature_tre
     column (str): Column name for temperature.
     output_file (str): Path to save the plot.
     """
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(10, 6))
     plt.plot(data["timestamp"], data[column], label="Temperature")
     plt.xlabel("Time")
@@ -23,6 +28,7 @@ def track_temperature_changes(data, column, output_file="outputs/temperature_tre
     print(f"Temperature trends plot saved to {output_file}")
     plt.show()
 
+@instrument
 def detect_temperature_anomalies(data, column, threshold, output_file="outputs/temperature_anomalies.csv"):
     """
     Detects temperature anomalies based on a threshold.
@@ -37,13 +43,91 @@ def detect_temperature_anomalies(data, column, threshold, output_file="outputs/t
     pd.DataFrame: DataFrame with anomalies.
     """
     anomalies = data[data[column] > threshold]
-    print(f"\nDetected Temperature Anomalies (>{threshold}°C):")
-    print(anomalies)
+    show(f"\nDetected Temperature Anomalies (>{threshold}°C):")
+    show(anomalies)
 
     anomalies.to_csv(output_file, index=False)
     print(f"Temperature anomalies saved to {output_file}")
     return anomalies
 
+@instrument
+def detect_exceedance_events(data, limits, hysteresis=0.0, min_duration=0.0, time_column="timestamp",
+                             output_file="outputs/temperature_events.csv"):
+    """
+    Extracts over-limit events for many sensors at once using hysteresis bands.
+
+    An event starts when a sensor rises above its limit and ends only once it
+    falls to or below (limit - hysteresis), so noise around the limit does not
+    split one excursion into many. Each event is reduced to a single record
+    instead of one row per sample.
+
+    Parameters:
+    data (pd.DataFrame): Dataset with a time column and one column per sensor.
+    limits (dict): Mapping of sensor column -> upper limit.
+    hysteresis (float or dict): Hysteresis band below the limit, scalar or per sensor.
+    min_duration (float or dict): Minimum event duration in seconds, scalar or per sensor.
+    time_column (str): Column name for time (datetimes or seconds).
+    output_file (str): Path to save the event records.
+
+    Returns:
+    pd.DataFrame: One row per event with sensor, start, end, peak, duration_s
+    and integral_over_limit (degree-seconds above the limit).
+    """
+    sensors = list(limits)
+    upper = np.array([limits[s] for s in sensors], dtype=float)
+    band = np.array([hysteresis[s] if isinstance(hysteresis, dict) else hysteresis for s in sensors], dtype=float)
+    min_dur = np.array([min_duration[s] if isinstance(min_duration, dict) else min_duration for s in sensors],
+                       dtype=float)
+    lower = upper - band
+
+    times = data[time_column].values
+    seconds = to_seconds(times, relative=True)
+    values = data[sensors].to_numpy(dtype=float)
+    n, m = values.shape
+
+    # Latch the on/off state: samples inside the band (or NaN) keep the last decided state
+    on = values > upper
+    decided = on | (values <= lower)
+    last = np.where(decided, np.arange(n)[:, None], -1)
+    np.maximum.accumulate(last, axis=0, out=last)
+    state = np.where(last >= 0, np.take_along_axis(on, np.maximum(last, 0), axis=0), False)
+
+    # Run boundaries, ordered sensor by sensor (end is exclusive)
+    edges = np.diff(state.T.astype(np.int8), axis=1, prepend=0, append=0)
+    sensor_idx, start = np.nonzero(edges == 1)
+    end = np.nonzero(edges == -1)[1]
+
+    duration = seconds[end - 1] - seconds[start]
+    keep = duration >= min_dur[sensor_idx]
+    sensor_idx, start, end, duration = sensor_idx[keep], start[keep], end[keep], duration[keep]
+
+    # Peak per event via reduceat over the sensor-major flattened array
+    flat = np.append(np.where(np.isnan(values), -np.inf, values).T.ravel(), -np.inf)
+    bounds = np.column_stack([sensor_idx * n + start, sensor_idx * n + end]).ravel()
+    peak = np.maximum.reduceat(flat, bounds)[::2] if bounds.size else np.empty(0)
+
+    # Trapezoidal integral of the excess above the limit, from cumulative sums
+    excess = np.nan_to_num(np.clip(values - upper, 0, None))
+    segments = 0.5 * (excess[1:] + excess[:-1]) * np.diff(seconds)[:, None]
+    cumulative = np.vstack([np.zeros((1, m)), np.cumsum(segments, axis=0)])
+    integral = cumulative[end - 1, sensor_idx] - cumulative[start, sensor_idx]
+
+    events = pd.DataFrame({
+        "sensor": np.array(sensors, dtype=object)[sensor_idx],
+        "start": times[start],
+        "end": times[end - 1],
+        "peak": peak,
+        "duration_s": duration,
+        "integral_over_limit": integral,
+    })
+    print(f"\nDetected {len(events)} Exceedance Events across {m} sensors")
+    show(events)
+
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    events.to_csv(output_file, index=False)
+    print(f"Exceedance events saved to {output_file}")
+    return events
+
 def heat_dissipation_model(t, T0, tau, Tamb):
     """
     Exponential decay model for heat dissipation.
@@ -59,10 +143,23 @@ def heat_dissipation_model(t, T0, tau, Tamb):
     """
     return T0 * np.exp(-t / tau) + Tamb
 
+@memoize
+def _fit_heat_model(time, temperature):
+    """
+    Fits heat_dissipation_model and returns [T0, tau, Tamb] (cached on disk).
+    """
+    from scipy.optimize import curve_fit
+
+    popt, _ = curve_fit(heat_dissipation_model, time, temperature, p0=[temperature[0], 100, 20])
+    return popt
+
+@instrument
 def fit_heat_dissipation(data, time_column, temp_column, output_file="outputs/heat_dissipation_fit.png"):
     """
     Fits an exponential decay model to heat dissipation data.
 
+    The fitted parameters and the plot are cached (see result_cache.cached_output_file).
+
     Parameters:
     data (pd.DataFrame): Dataset with time and temperature data.
     time_column (str): Column name for time.
@@ -73,25 +170,31 @@ def fit_heat_dissipation(data, time_column, temp_column, output_file="outputs/he
     temperature = data[temp_column].values
 
     # Fit the heat dissipation model
-    popt, _ = curve_fit(heat_dissipation_model, time, temperature, p0=[temperature[0], 100, 20])
+    popt = _fit_heat_model(time, temperature)
     T0, tau, Tamb = popt
     print(f"\nFitted Heat Dissipation Parameters:")
     print(f"Initial Temperature (T0): {T0:.2f}°C")
     print(f"Time Constant (tau): {tau:.2f}s")
     print(f"Ambient Temperature (Tamb): {Tamb:.2f}°C")
 
-    # Plot the fit
-    plt.figure(figsize=(10, 6))
-    plt.scatter(time, temperature, label="Observed Data", color="red")
-    plt.plot(time, heat_dissipation_model(time, *popt), label="Fitted Model", color="blue")
-    plt.xlabel("Time (s)")
-    plt.ylabel("Temperature (°C)")
-    plt.title("Heat Dissipation Fit")
-    plt.legend()
-    plt.grid()
-    plt.savefig(output_file)
+    def render():
+        import matplotlib.pyplot as plt
+
+        # Plot the fit
+        plt.figure(figsize=(10, 6))
+        plt.scatter(time, temperature, label="Observed Data", color="red")
+        plt.plot(time, heat_dissipation_model(time, *popt), label="Fitted Model", color="blue")
+        plt.xlabel("Time (s)")
+        plt.ylabel("Temperature (°C)")
+        plt.title("Heat Dissipation Fit")
+        plt.legend()
+        plt.grid()
+        plt.savefig(output_file)
+        plt.show()
+
+    cached_output_file(output_file, render, fit_heat_dissipation, heat_dissipation_model, time, temperature, popt,
+                       shows_figure=True)
     print(f"Heat dissipation fit plot saved to {output_file}")
-    plt.show()
 
 if __name__ == "__main__":
     # Load the dataset
@@ -104,6 +207,9 @@ if __name__ == "__main__":
     # Detect temperature anomalies
     anomalies = detect_temperature_anomalies(data, "temperature_c", threshold=50.0)
 
+    # Extract compact exceedance events with a hysteresis band
+    events = detect_exceedance_events(data, {"temperature_c": 42.0}, hysteresis=5.0, min_duration=60)
+
     # Fit heat dissipation model
     dissipation_data = data[["time_s", "temperature_c"]].dropna()
     fit_heat_dissipation(dissipation_data, "time_s", "temperature_c")
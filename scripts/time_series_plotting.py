@@ -1,8 +1,7 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
+from instrumentation import instrument
 
+@instrument
 def plot_time_series(data, columns, output_file="outputs/time_series_plot.png"):
     """
     Plots time-series data for specified columns using Matplotlib and Seaborn.
@@ -12,6 +11,9 @@ def plot_time_series(data, columns, output_file="outputs/time_series_plot.png"):
     columns (list): List of column names to plot.
     output_file (str): Path to save the plot.
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     sns.set(style="whitegrid")
     plt.figure(figsize=(10, 6))
     for column in columns:
@@ -25,6 +27,7 @@ def plot_time_series(data, columns, output_file="outputs/time_series_plot.png"):
     print(f"Static time-series plot saved to {output_file}")
     plt.show()
 
+@instrument
 def plot_time_series_interactive(data, columns):
     """
     Creates an interactive time-series plot using Plotly.
@@ -33,6 +36,8 @@ def plot_time_series_interactive(data, columns):
     data (pd.DataFrame): The dataset.
     columns (list): List of column names to plot.
     """
+    import plotly.express as px
+
     fig = px.line(data, x="timestamp", y=columns, title="Interactive Time-Series Data")
     fig.update_layout(xaxis_title="Time", yaxis_title="Values")
     fig.show()
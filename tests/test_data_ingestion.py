@@ -0,0 +1,34 @@
+import os
+import sys
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from data_ingestion import csv_engine, load_telemetry_files
+
+ENGINES = sorted({"c", csv_engine()})
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_blank_cells_load_as_missing(tmp_path, engine):
+    file_path = tmp_path / "thermal.csv"
+    file_path.write_text("timestamp,time_s,temperature_c,sensor\n"
+                         "2024-11-01 00:00:00,0,21.5,panel\n"
+                         "2024-11-01 00:00:01,,21.7,\n")
+    data = load_telemetry_files([str(file_path)], kind="thermal", max_workers=1, engine=engine)
+    assert str(data["time_s"].dtype) == "Int32"
+    assert data["time_s"].isna().tolist() == [False, True]
+    assert data["sensor"].isna().tolist() == [False, True]
+    assert data["timestamp"].dtype == "datetime64[ns]"
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_files_with_different_columns_are_combined(tmp_path, engine):
+    first = tmp_path / "day1.csv"
+    second = tmp_path / "day2.csv"
+    first.write_text("timestamp,temperature_c,time_s\n2024-11-01 00:00:00,21.5,0\n")
+    second.write_text("timestamp,temperature_c,sensor\n2024-11-02 00:00:00,22.0,panel\n")
+    data = load_telemetry_files([str(first), str(second)], kind="thermal", max_workers=1, engine=engine)
+    assert list(data.columns) == ["timestamp", "temperature_c", "time_s", "sensor"]
+    assert data["time_s"].tolist()[0] == 0 and data["time_s"].isna().tolist() == [False, True]
+    assert data["sensor"].isna().tolist() == [True, False]
+    assert data["timestamp"].tolist() == list(pd.to_datetime(["2024-11-01", "2024-11-02"]))
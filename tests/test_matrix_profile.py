@@ -0,0 +1,53 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from anomaly_detection import matrix_profile
+
+def brute_force_profile(series, m):
+    """
+    Matrix profile by comparing every pair of subsequences directly, with the same rules
+    for flat subsequences (two flat ones match exactly, a flat and a varying one are sqrt(m) apart).
+    """
+    windows = np.lib.stride_tricks.sliding_window_view(series, m)
+    flat = np.ptp(windows, axis=1) == 0
+    exclusion = max(1, m // 4)
+    profile = np.full(len(windows), np.inf)
+    for i in range(len(windows)):
+        for j in range(len(windows)):
+            if abs(i - j) <= exclusion:
+                continue
+            if flat[i] and flat[j]:
+                distance = 0.0
+            elif flat[i] or flat[j]:
+                distance = np.sqrt(m)
+            else:
+                a = (windows[i] - windows[i].mean()) / windows[i].std()
+                b = (windows[j] - windows[j].mean()) / windows[j].std()
+                distance = np.linalg.norm(a - b)
+            profile[i] = min(profile[i], distance)
+    return profile
+
+@pytest.mark.parametrize("level", [0.0, 1e3, 1e6])
+def test_flat_segment_at_large_offset(level):
+    rng = np.random.default_rng(0)
+    series = level + rng.normal(size=300)
+    series[100:140] = level + 0.37  # Stuck sensor
+    window = 10
+
+    result = matrix_profile(series, window, max_workers=1)
+
+    np.testing.assert_allclose(result["profile"], brute_force_profile(series, window), atol=1e-6)
+
+def test_incremental_update_matches_full_computation():
+    rng = np.random.default_rng(1)
+    series = 5e5 + rng.normal(size=250)
+    series[60:90] = 5e5
+
+    state = matrix_profile(series[:150], 12, max_workers=1)
+    state = matrix_profile(series[150:], 12, max_workers=1, state=state)
+
+    np.testing.assert_allclose(state["profile"], brute_force_profile(series, 12), atol=1e-6)